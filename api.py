@@ -1,11 +1,92 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from load_scenario import load_ship_from_specs, load_scenario_containers
-from py3dbc.maritime.packer import MaritimePacker
-import pandas as pd
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+from typing import Literal
+from load_scenario import load_ship_from_specs, load_scenario_containers, read_ship_specs
+from manifest_store import get_manifest_store
+from job_queue import JobQueue, QueueFullError
+from result_cache import ResultCache
+from scenario_catalog import ScenarioCatalog
+from solve_metrics import SolveMetrics
+from plan_format import (
+    COLUMNS_BINARY, COLUMNS_JSON, columns_to_json, encode_columns, plan_columns, slot_position
+)
+from py3dbc.maritime.packer import MaritimePacker, STRATEGIES
+from py3dbc.maritime.observers import BatchingObserver, PackingObserver
+from py3dbc.maritime.preflight import optimality_gap
+import asyncio
 import json
+import os
+import queue
+import random
+import threading
+
+# Background optimization jobs (sized from the environment)
+JOB_WORKERS = int(os.environ.get("CARGOOPTIX_JOB_WORKERS", 0)) or None
+JOB_QUEUE_DEPTH = int(os.environ.get("CARGOOPTIX_JOB_QUEUE_DEPTH", 16))
+
+# Finished solves behind /optimize, evicted by approximate size
+RESULT_CACHE_MB = int(os.environ.get("CARGOOPTIX_RESULT_CACHE_MB", 64))
+
+# How often the scenario catalog checks its files for changes
+CATALOG_POLL_SECONDS = float(os.environ.get("CARGOOPTIX_CATALOG_POLL_SECONDS", 2))
+
+# Events an SSE stream buffers before its solve waits for the client
+STREAM_QUEUE_SIZE = 64
+# Largest batch of placements a stream event may carry
+MAX_STREAM_BATCH = 1000
+STREAM_IDLE = object()
+
+# Longest local-search budget a request may ask for (seconds)
+MAX_IMPROVE_SECONDS = float(os.environ.get("CARGOOPTIX_MAX_IMPROVE_SECONDS", 10))
+
+# Packing orders plus the API's search modes; anything else is a 422
+Strategy = Literal[STRATEGIES + ('port_rotation', 'portfolio', 'beam')]
+
+# Slot search engine for API solves; both give the same plans, vectorized is faster
+SOLVER_ENGINE = os.environ.get("CARGOOPTIX_ENGINE", "vectorized")
+
+# Fraction of solves run with per-phase profiling, aggregated at /metrics
+# (profiled solves take the slower timed search loop, so off by default)
+PROFILE_RATE = min(max(float(os.environ.get("CARGOOPTIX_PROFILE_RATE", 0)), 0.0), 1.0)
+
+job_queue = None
+scenario_catalog = ScenarioCatalog()
+result_cache = ResultCache(max_bytes=RESULT_CACHE_MB * 1024 * 1024, sizeof=lambda solve: solve_size(solve))
+solve_metrics = SolveMetrics()
+
+
+def warm_worker():
+    """Preload the ship template and manifest cache in a job worker"""
+    load_ship_from_specs()
+    get_manifest_store().scenario_ids()
 
-app = FastAPI(title="CargoOptix API", version="1.0")
+
+def get_job_queue():
+    global job_queue
+    if job_queue is None:
+        job_queue = JobQueue(
+            optimize_scenario_api,
+            max_workers=JOB_WORKERS,
+            max_pending=JOB_QUEUE_DEPTH,
+            initializer=warm_worker
+        )
+    return job_queue
+
+
+@asynccontextmanager
+async def lifespan(app):
+    scenario_catalog.refresh()
+    scenario_catalog.start_watching(CATALOG_POLL_SECONDS)
+    yield
+    scenario_catalog.stop_watching()
+    if job_queue is not None:
+        job_queue.shutdown()
+
+
+app = FastAPI(title="CargoOptix API", version="1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,31 +96,117 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def optimize_scenario_api(scenario_id):
+def run_optimization(scenario_id, strategy='heavy_first', gm_threshold=None, hazmat_separation=3,
+                     observer=None, improve_seconds=0, port_rotation=None):
+    """Pack one scenario and return (packer, pack result, strategy used)"""
     ship, specs = load_ship_from_specs()
     containers = load_scenario_containers(scenario_id)
+    bounds = get_manifest_store().scenario_bounds(
+        scenario_id, ship, ship.gm_min if gm_threshold is None else gm_threshold
+    )
 
-    packer = MaritimePacker(ship, gm_threshold=ship.gm_min, hazmat_separation=3)
-    result = packer.pack(containers, strategy='heavy_first')
-
-    # ✅ Ship dimensions from ShipHull.tsx:
-    # Hull: 60 (length) x 8 (height) x 15 (width)
-    # Deck at Y = 4
-    # Ship layout: 7 bays x 14 rows x 7 tiers
-    
-    SHIP_LENGTH = 60.0
-    SHIP_WIDTH = 15.0
-    DECK_HEIGHT = 4.0
-    
-    # Calculate spacing to fit containers within ship bounds
-    BAY_SPACING = SHIP_LENGTH / 7  # ≈ 8.57 units per bay
-    ROW_SPACING = SHIP_WIDTH / 14   # ≈ 1.07 units per row
-    TIER_HEIGHT = 2.6               # Standard container height
+    packer = MaritimePacker(
+        ship,
+        gm_threshold=ship.gm_min if gm_threshold is None else gm_threshold,
+        hazmat_separation=hazmat_separation,
+        observer=observer,
+        log_placements=False,
+        engine=SOLVER_ENGINE,
+        profile=random.random() < PROFILE_RATE,
+        port_rotation=port_rotation
+    )
+    if strategy == 'portfolio':
+        # All strategies, best plan wins; run in-process, since a pool per
+        # request would fork from the server threads and the job workers
+        result = packer.pack_portfolio(containers, max_workers=1)
+        strategy = result['strategy']
+    elif strategy == 'beam':
+        # Beam search over heavy_first order
+        result = packer.pack_beam(containers)
+    else:
+        result = packer.pack(containers, strategy=strategy)
 
-    return {
+    if improve_seconds > 0:
+        # Local search on the greedy plan within the time budget
+        result = packer.improve(result, time_budget=improve_seconds)
+
+    result['bounds'] = bounds
+    result['optimality_gap'] = optimality_gap(bounds, result['metrics'])
+    record_profile(result)
+    return packer, result, strategy
+
+def record_profile(result):
+    """Add a finished solve's profile (if profiled) to the /metrics histograms"""
+    if "profile" in result["metrics"]:
+        solve_metrics.observe(result["metrics"]["profile"])
+
+def record_job_profile(future):
+    # Jobs solve in worker processes, so record their profiles here
+    if not future.cancelled() and future.exception() is None:
+        record_profile(future.result())
+
+def plan_header(scenario_id, strategy, result):
+    """Fields shared by the row and column plan layouts"""
+    header = {
         "success": result["success"],
         "scenario_id": scenario_id,
+        "strategy": strategy,
         "metrics": result["metrics"],
+        "bounds": result["bounds"],
+        "optimality_gap": result["optimality_gap"],
+    }
+    if "improvement" in result:
+        header["improvement"] = result["improvement"]
+    return header
+
+def failed_rows(result):
+    return [
+        {
+            "id": c.container_id,
+            "type": c.cargo_type,
+            "weight": c.total_weight,
+            "reason": "Constraints not satisfied",
+        }
+        for c in result["failed"]
+    ]
+
+def solve_scenario(scenario_id, strategy='heavy_first', gm_threshold=None, hazmat_separation=3,
+                   improve_seconds=0, port_rotation=None, observer=None):
+    """
+    One solve that every response layout is built from
+
+    Returns:
+        dict: 'packer' (with the ship and checker the plan was solved
+              with), 'ship', 'result' and 'strategy', plus the failure
+              diagnoses once someone asks for them
+    """
+    packer, result, strategy = run_optimization(
+        scenario_id, strategy, gm_threshold, hazmat_separation, observer, improve_seconds, port_rotation
+    )
+    return {
+        "packer": packer,
+        "ship": packer.ship,
+        "result": result,
+        "strategy": strategy,
+        "diagnoses": None,
+        "lock": threading.Lock(),
+    }
+
+def solve_size(solve):
+    """Approximate memory held by a cached solve, for cache eviction"""
+    result = solve["result"]
+    header = {key: value for key, value in result.items() if key not in ("placed", "failed", "placement_log")}
+    containers = len(result["placed"]) + len(result["failed"])
+    # Ship slot table and slot engine arrays, the container objects, and
+    # room for the failure diagnoses computed later on request
+    return (len(json.dumps(header, default=str)) + 400 * len(solve["ship"].slots)
+            + 600 * containers + 1000 * len(result["failed"]))
+
+def plan_rows(scenario_id, solve):
+    """Plan with one JSON object per placed container"""
+    result = solve["result"]
+    return {
+        **plan_header(scenario_id, solve["strategy"], result),
         "placed_containers": [
             {
                 "id": c.container_id,
@@ -50,45 +217,354 @@ def optimize_scenario_api(scenario_id):
                 "bay": getattr(c.assigned_slot, 'bay', 0) if c.assigned_slot else 0,
                 "row": getattr(c.assigned_slot, 'row', 0) if c.assigned_slot else 0,
                 "tier": getattr(c.assigned_slot, 'tier', 0) if c.assigned_slot else 0,
-                "position": {
-                    # X: Distribute 7 bays across ship length (60 units), centered at 0
-                    "x": (getattr(c.assigned_slot, 'bay', 0) - 3) * BAY_SPACING if c.assigned_slot else 0,
-                    # Y: Stack containers starting from deck (Y=4), going upward
-                    "y": DECK_HEIGHT + 0.5 + (getattr(c.assigned_slot, 'tier', 0) * TIER_HEIGHT) if c.assigned_slot else 0,
-                    # Z: Distribute 14 rows across ship width (15 units), centered at 0
-                    "z": (getattr(c.assigned_slot, 'row', 0) - 6.5) * ROW_SPACING if c.assigned_slot else 0,
-                } if c.assigned_slot else {"x": 0, "y": 0, "z": 0},
+                "position": slot_position(c.assigned_slot),
             }
             for c in result["placed"]
         ],
+        "failed_containers": failed_rows(result),
+    }
+
+def plan_columns_body(scenario_id, solve):
+    """Like plan_rows, with placed containers as typed columns"""
+    result = solve["result"]
+    columns, type_labels = plan_columns(solve["ship"], result["placed"])
+
+    return {
+        **plan_header(scenario_id, solve["strategy"], result),
+        "type_labels": type_labels,
+        "columns": columns,
+        "failed_containers": failed_rows(result),
+    }
+
+def solve_diagnoses(solve):
+    """
+    Failure diagnoses of a solve, worked out on first request
+
+    Uses the solve's own packer, so its checker (and any custom stages)
+    and GM threshold are what the plan was packed with.
+    """
+    with solve["lock"]:
+        if solve["diagnoses"] is None:
+            solve["diagnoses"] = solve["packer"].diagnose_failures(solve["result"]["failed"])
+        return solve["diagnoses"]
+
+def plan_diagnostics(scenario_id, solve):
+    """Why each container of the plan found no slot (see FailureDiagnostics)"""
+    result = solve["result"]
+    diagnoses = solve_diagnoses(solve)
+
+    return {
+        "success": result["success"],
+        "scenario_id": scenario_id,
+        "strategy": solve["strategy"],
+        "metrics": result["metrics"],
         "failed_containers": [
-            {
-                "id": c.container_id,
-                "type": c.cargo_type,
-                "weight": c.total_weight,
-                "reason": "Constraints not satisfied",
-            }
-            for c in result["failed"]
+            dict(row, diagnosis=diagnoses[row["id"]]) for row in failed_rows(result)
         ],
     }
 
+def optimize_scenario_api(scenario_id, strategy='heavy_first', gm_threshold=None, hazmat_separation=3,
+                          observer=None, improve_seconds=0, port_rotation=None):
+    """Solve and return the row layout (used by jobs and the event stream)"""
+    solve = solve_scenario(
+        scenario_id, strategy, gm_threshold, hazmat_separation, improve_seconds, port_rotation, observer
+    )
+    return plan_rows(scenario_id, solve)
+
+def result_cache_key(scenario_id, strategy, gm_threshold, hazmat_separation, improve_seconds=0,
+                     port_rotation=None):
+    """Everything a solve depends on, by content (not the layout it is served in)"""
+    _, specs = read_ship_specs()
+    return (
+        get_manifest_store().scenario_digest(scenario_id),
+        json.dumps(specs, sort_keys=True, default=str),
+        strategy,
+        specs['gm_min'] if gm_threshold is None else gm_threshold,
+        hazmat_separation,
+        improve_seconds,
+        port_rotation,
+    )
+
+def cached_solve(scenario_id, strategy='heavy_first', gm_threshold=None, hazmat_separation=3,
+                 improve_seconds=0, port_rotation=None):
+    """
+    Solve shared across identical and concurrent requests
+
+    Cached once per parameter set; rows, columns and diagnostics are all
+    formatted from the same entry. Entries are shared, so treat them as
+    read-only.
+    """
+    key = result_cache_key(scenario_id, strategy, gm_threshold, hazmat_separation, improve_seconds, port_rotation)
+    return result_cache.get_or_compute(
+        key,
+        lambda: solve_scenario(
+            scenario_id, strategy, gm_threshold, hazmat_separation, improve_seconds, port_rotation
+        )
+    )
+
+def catalog_response(body, if_none_match, catalog=None):
+    """Serve a pre-encoded catalog body, or 304 if the client's copy is current"""
+    catalog = catalog or scenario_catalog.current
+    headers = {"ETag": catalog.etag, "Cache-Control": "no-cache"}
+    if if_none_match and catalog.etag in if_none_match:
+        return Response(status_code=304, headers=headers)
+    return Response(body(catalog), media_type="application/json", headers=headers)
+
 @app.get("/scenarios")
-def get_scenario_list():
-    metadata = pd.read_csv("scenario_metadata.csv")
-    return [
-        {
-            "id": row["scenario_id"],
-            "containers": row["num_containers"],
-            "teu": row["actual_teu"],
-            "sea_state": row["sea_state"],
-            "utilization": row["actual_utilization"],
-        }
-        for _, row in metadata.iterrows()
-    ]
+def get_scenario_list(if_none_match: str | None = Header(default=None)):
+    return catalog_response(lambda catalog: catalog.scenarios_body, if_none_match)
+
+@app.get("/scenarios/{scenario_id}")
+def get_scenario(scenario_id: int, if_none_match: str | None = Header(default=None)):
+    # One snapshot for the check and the body: the watcher may swap it meanwhile
+    catalog = scenario_catalog.current
+    if scenario_id not in catalog.scenario_bodies:
+        raise HTTPException(status_code=404, detail="Unknown scenario")
+    return catalog_response(lambda catalog: catalog.scenario_bodies[scenario_id], if_none_match, catalog)
+
+@app.get("/ship")
+def get_ship_specs(if_none_match: str | None = Header(default=None)):
+    return catalog_response(lambda catalog: catalog.ship_body, if_none_match)
+
+def require_scenario(scenario_id):
+    """404 for a scenario the catalog snapshot doesn't list, before any solve"""
+    if scenario_id not in scenario_catalog.current.manifest_sizes:
+        raise HTTPException(status_code=404, detail="Unknown scenario")
+
+def scenario_preflight(scenario_id, gm_threshold=None):
+    require_scenario(scenario_id)
+    ship, _ = load_ship_from_specs()
+    return get_manifest_store().scenario_bounds(scenario_id, ship, gm_threshold)
+
+@app.get("/scenarios/{scenario_id}/preflight")
+def get_scenario_preflight(scenario_id: int, gm_threshold: float | None = None):
+    """Upper bounds on placements, TEU and GM for a scenario, without solving it"""
+    return scenario_preflight(scenario_id, gm_threshold)
+
+def parse_rotation(port_rotation, strategy):
+    """'PORT_A,PORT_B' -> ('PORT_A', 'PORT_B'), None if not given"""
+    ports = tuple(port.strip() for port in (port_rotation or '').split(",") if port.strip())
+    if len(set(ports)) != len(ports):
+        raise HTTPException(status_code=422, detail="port_rotation lists a port twice")
+    if strategy == 'port_rotation' and not ports:
+        raise HTTPException(status_code=422, detail="Strategy 'port_rotation' needs a port_rotation")
+    return ports or None
 
 @app.get("/optimize/{scenario_id}")
-def optimize_scenario(scenario_id: int):
-    return optimize_scenario_api(scenario_id)
+def optimize_scenario(scenario_id: int, strategy: Strategy = 'heavy_first',
+                      gm_threshold: float | None = None, hazmat_separation: int = 3,
+                      improve_seconds: float = Query(0, ge=0, le=MAX_IMPROVE_SECONDS),
+                      port_rotation: str | None = None,
+                      accept: str | None = Header(default=None)):
+    """
+    Optimized plan for a scenario
+
+    port_rotation is a comma-separated list of ports in discharge order;
+    it turns on multi-port stowage and adds metrics.restows.
+
+    Send Accept: application/vnd.cargooptix.columns+json for placed
+    containers as JSON column lists, or application/vnd.cargooptix.columns
+    for the packed binary columns (see plan_format.encode_columns).
+    """
+    require_scenario(scenario_id)
+    solve = cached_solve(
+        scenario_id, strategy, gm_threshold, hazmat_separation, round(improve_seconds, 1),
+        parse_rotation(port_rotation, strategy)
+    )
+    # The cached solve is shared between requests, so format it with the
+    # requested id rather than whichever request computed it
+    accept = accept or ''
+    # Both columnar media types start with COLUMNS_BINARY
+    if COLUMNS_BINARY not in accept:
+        return plan_rows(scenario_id, solve)
+    plan = plan_columns_body(scenario_id, solve)
+    if COLUMNS_JSON in accept:
+        return JSONResponse(columns_to_json(plan), media_type=COLUMNS_JSON)
+    return Response(encode_columns(plan), media_type=COLUMNS_BINARY)
+
+@app.get("/optimize/{scenario_id}/diagnostics")
+def diagnose_scenario(scenario_id: int, strategy: Strategy = 'heavy_first',
+                      gm_threshold: float | None = None, hazmat_separation: int = 3,
+                      improve_seconds: float = Query(0, ge=0, le=MAX_IMPROVE_SECONDS),
+                      port_rotation: str | None = None):
+    """
+    Failure diagnostics for the plan /optimize returns with the same parameters
+
+    Per failed container: slots per binding constraint and the closest
+    near-miss slot with what it breaks.
+    """
+    require_scenario(scenario_id)
+    solve = cached_solve(
+        scenario_id, strategy, gm_threshold, hazmat_separation, round(improve_seconds, 1),
+        parse_rotation(port_rotation, strategy)
+    )
+    return plan_diagnostics(scenario_id, solve)
+
+class StreamClosed(Exception):
+    """Raised inside a streamed solve once its client has gone, to abort the pack"""
+
+def describe_placement(c, slot):
+    return {"type": c.cargo_type, "size": c.teu_size, "position": slot_position(slot)}
+
+def sse_message(event):
+    return f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+def replay_events(solve, batch_size):
+    """
+    The events a live stream would send, from a cached solve
+
+    Placements come bottom tier first with their running GM and weight
+    (see MaritimePacker.replay_log), then the failed containers.
+    """
+    result = solve["result"]
+    by_id = {c.container_id: c for c in result["placed"]}
+    yield {"event": "start", "total": len(result["placed"]) + len(result["failed"]), "strategy": solve["strategy"]}
+
+    entries = []
+    for logged in solve["packer"].replay_log(result["placed"]):
+        c = by_id[logged["container"]]
+        slot = c.assigned_slot
+        entries.append(("placed", {
+            "step": len(entries) + 1, "id": c.container_id, "slot": logged["slot"],
+            "bay": slot.bay, "row": slot.row, "tier": slot.tier,
+            "gm": logged["gm"], "weight": logged["weight"], **describe_placement(c, slot),
+        }))
+    for c in result["failed"]:
+        entries.append(("failed", {"step": len(entries) + 1, "id": c.container_id, "reason": "No valid slot available"}))
+
+    for start in range(0, len(entries), batch_size):
+        batch = entries[start:start + batch_size]
+        yield {
+            "event": "placements",
+            "placed": [entry for kind, entry in batch if kind == "placed"],
+            "failed": [entry for kind, entry in batch if kind == "failed"],
+        }
+    yield {"event": "finish", "metrics": result["metrics"]}
+
+def start_live_solve(scenario_id, strategy, gm_threshold, hazmat_separation, batch_size, stop):
+    """
+    Run one optimization in a thread, sending its events to a bounded queue
+
+    A slow client makes the solve wait for room in the queue; once stop
+    is set the next event raises StreamClosed, which aborts the pack. A
+    finished solve goes into the result cache like any other.
+    """
+    events = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+
+    def put(event):
+        while not stop.is_set():
+            try:
+                events.put(event, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+        raise StreamClosed()
+
+    observer = BatchingObserver(put, batch_size=batch_size, describe=describe_placement)
+
+    def solve():
+        try:
+            try:
+                solved = solve_scenario(scenario_id, strategy, gm_threshold, hazmat_separation, observer=observer)
+                solved["packer"].observer = PackingObserver()
+                result_cache.get_or_compute(
+                    result_cache_key(scenario_id, strategy, gm_threshold, hazmat_separation), lambda: solved
+                )
+            except StreamClosed:
+                raise
+            except Exception as e:
+                put({"event": "error", "detail": str(e)})
+            put(None)
+        except StreamClosed:
+            pass
+
+    threading.Thread(target=solve, daemon=True).start()
+    return events
+
+def next_event(events, timeout=0.5):
+    """Next queued event, or STREAM_IDLE if none arrived within timeout"""
+    try:
+        return events.get(timeout=timeout)
+    except queue.Empty:
+        return STREAM_IDLE
+
+async def stream_events(request, scenario_id, strategy, gm_threshold, hazmat_separation, batch_size):
+    """Yield a plan's events as SSE messages: replayed if cached, else live from a new solve"""
+    solved = result_cache.get(result_cache_key(scenario_id, strategy, gm_threshold, hazmat_separation))
+    if solved is not None:
+        for event in replay_events(solved, batch_size):
+            yield sse_message(event)
+        return
+
+    stop = threading.Event()
+    events = start_live_solve(scenario_id, strategy, gm_threshold, hazmat_separation, batch_size, stop)
+    try:
+        while True:
+            event = await asyncio.to_thread(next_event, events)
+            if event is None:
+                break
+            if event is STREAM_IDLE:
+                if await request.is_disconnected():
+                    break
+                continue
+            yield sse_message(event)
+    finally:
+        # Disconnect or cancellation: stop the solve instead of finishing it for nobody
+        stop.set()
+
+@app.get("/optimize/{scenario_id}/stream")
+def stream_optimize_scenario(request: Request, scenario_id: int, strategy: Strategy = 'heavy_first',
+                             gm_threshold: float | None = None, hazmat_separation: int = 3,
+                             batch_size: int = Query(20, ge=1, le=MAX_STREAM_BATCH)):
+    """Server-sent events: start, batches of placements with running GM/weight, finish"""
+    require_scenario(scenario_id)
+    return StreamingResponse(
+        stream_events(request, scenario_id, strategy, gm_threshold, hazmat_separation, batch_size),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+@app.get("/cache/stats")
+def get_result_cache_stats():
+    return result_cache.stats()
+
+@app.get("/metrics")
+def get_solve_metrics():
+    """Histograms of solver phase times, slots examined and rejections per constraint"""
+    return dict(solve_metrics.to_dict(), profile_rate=PROFILE_RATE)
+
+class OptimizeJobRequest(BaseModel):
+    scenario_id: int
+    strategy: Strategy = 'heavy_first'
+
+@app.post("/jobs/optimize", status_code=202)
+def submit_optimize_job(request: OptimizeJobRequest):
+    # Cheap bounds first: don't queue a solve that cannot place anything
+    # Jobs take no rotation, so 'port_rotation' cannot run
+    parse_rotation(None, request.strategy)
+    bounds = scenario_preflight(request.scenario_id)
+    if bounds["placeable"] == 0:
+        raise HTTPException(status_code=422, detail={"message": "No container can be placed", "preflight": bounds})
+    try:
+        job = get_job_queue().submit(scenario_id=request.scenario_id, strategy=request.strategy)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    job.future.add_done_callback(record_job_profile)
+    return dict(job.to_dict(include_result=False), preflight=bounds)
+
+@app.get("/jobs/{job_id}")
+def get_optimize_job(job_id: str):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job.to_dict()
+
+@app.delete("/jobs/{job_id}")
+def cancel_optimize_job(job_id: str):
+    job = get_job_queue().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job.to_dict(include_result=False)
 
 @app.get("/")
 def root():
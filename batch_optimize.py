@@ -1,66 +1,136 @@
 """
 Run all 20 scenarios and collect aggregate statistics
 """
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
-from load_scenario import optimize_scenario
+from load_scenario import build_ship, ship_templates
+from manifest_store import get_manifest_store
+from py3dbc.maritime.packer import MaritimePacker
+from py3dbc.maritime.preflight import optimality_gap
 import time
 
-print("="*80)
-print("BATCH OPTIMIZATION - ALL 20 SCENARIOS")
-print("="*80)
-
-all_results = []
-start_time = time.time()
-
-for scenario_id in range(1, 21):
-    print(f"\n[{scenario_id}/20] Processing Scenario {scenario_id}...")
-    
-    try:
-        result = optimize_scenario(scenario_id)
-        metrics = result['metrics']
-        metrics['scenario_id'] = scenario_id
-        all_results.append(metrics)
-        
-        print(f"  ✓ Placed: {metrics['placed_containers']}/{metrics['total_containers']}")
-        print(f"  ✓ GM: {metrics['gm']}m")
-        
-    except Exception as e:
-        print(f"  ✗ Error: {e}")
-        continue
-
-# Save detailed results
-results_df = pd.DataFrame(all_results)
-results_df.to_csv('batch_results_all_scenarios.csv', index=False)
-
-# Generate summary statistics
-print("\n" + "="*80)
-print("AGGREGATE ANALYSIS")
-print("="*80)
-
-print(f"\nScenarios completed: {len(results_df)}/20")
-
-print(f"\n📊 PLACEMENT PERFORMANCE:")
-print(f"  Average placement rate: {results_df['placement_rate'].mean():.2f}%")
-print(f"  Best: {results_df['placement_rate'].max():.2f}%")
-print(f"  Worst: {results_df['placement_rate'].min():.2f}%")
-print(f"  Std deviation: {results_df['placement_rate'].std():.2f}%")
-
-print(f"\n📦 UTILIZATION:")
-print(f"  Average slot utilization: {results_df['slot_utilization'].mean():.2f}%")
-print(f"  Average TEU loaded: {results_df['total_teu'].mean():.0f}")
-
-print(f"\n⚓ STABILITY:")
-print(f"  Average GM: {results_df['gm'].mean():.3f}m")
-print(f"  Minimum GM: {results_df['gm'].min():.3f}m")
-print(f"  All stable: {results_df['is_stable'].all()}")
-print(f"  Average margin: {results_df['stability_margin'].mean():.3f}m")
-
-print(f"\n⚖️ WEIGHT:")
-print(f"  Average loaded: {results_df['total_weight'].mean():.1f}t")
-print(f"  Maximum loaded: {results_df['total_weight'].max():.1f}t")
-
-print(f"\n⏱️ PERFORMANCE:")
-print(f"  Total time: {time.time() - start_time:.1f} seconds")
-print(f"  Avg per scenario: {(time.time() - start_time)/len(results_df):.1f} seconds")
-
-print(f"\n✅ Results saved to 'batch_results_all_scenarios.csv'")
\ No newline at end of file
+
+def batch_ship(specs):
+    """Empty copy of the ship for specs, built once per process"""
+    key = ('batch', tuple(sorted(specs.items())))
+    return ship_templates.get(key, factory=lambda: build_ship(specs))
+
+
+def warm_worker(specs):
+    """Build the worker's ship template before its first scenario"""
+    batch_ship(specs)
+
+
+def solve_scenario(scenario_id, manifests_path, specs, strategy='heavy_first'):
+    """Pack one scenario from the manifest cache and return its metrics"""
+    ship = batch_ship(specs)
+    store = get_manifest_store(manifests_path)
+    bounds = store.scenario_bounds(scenario_id, ship)
+    containers = store.load_containers(scenario_id)
+
+    packer = MaritimePacker(
+        ship, gm_threshold=ship.gm_min, hazmat_separation=3,
+        engine='vectorized', log_placements=False
+    )
+    result = packer.pack(containers, strategy=strategy)
+
+    metrics = result['metrics']
+    metrics['scenario_id'] = scenario_id
+    metrics['placement_rate_bound'] = bounds['placement_rate_bound']
+    metrics.update(optimality_gap(bounds, metrics))
+    return metrics
+
+
+def run_batch(scenario_ids=range(1, 21), max_workers=None, strategy='heavy_first',
+              manifests_path='container_manifests.csv', ship_specs_path='ship_specifications.csv'):
+    """
+    Optimize scenarios across a process pool
+
+    The manifest is parsed once into its columnar cache and the ship
+    specs once here; each worker builds the ship once as a template,
+    copies it per scenario, memory-maps the cache and slices out its
+    own scenario's rows.
+
+    Returns:
+        DataFrame with one row of metrics per completed scenario
+    """
+    specs = pd.read_csv(ship_specs_path).iloc[0].to_dict()
+    available = set(get_manifest_store(manifests_path).scenario_ids())
+
+    all_results = []
+    total = len(scenario_ids)
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=warm_worker, initargs=(specs,)) as pool:
+        futures = {}
+        for scenario_id in scenario_ids:
+            if scenario_id not in available:
+                print(f"  ✗ Scenario {scenario_id}: not in manifest")
+                continue
+            future = pool.submit(solve_scenario, scenario_id, manifests_path, specs, strategy)
+            futures[future] = scenario_id
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            scenario_id = futures[future]
+            try:
+                metrics = future.result()
+            except Exception as e:
+                print(f"\n[{done}/{total}] Scenario {scenario_id}")
+                print(f"  ✗ Error: {e}")
+                continue
+
+            all_results.append(metrics)
+            print(f"\n[{done}/{total}] Scenario {scenario_id}")
+            print(f"  ✓ Placed: {metrics['placed_containers']}/{metrics['total_containers']}")
+            print(f"  ✓ GM: {metrics['gm']}m")
+
+    results_df = pd.DataFrame(all_results)
+    if not results_df.empty:
+        results_df = results_df.sort_values('scenario_id').reset_index(drop=True)
+    return results_df
+
+
+if __name__ == "__main__":
+    print("="*80)
+    print("BATCH OPTIMIZATION - ALL 20 SCENARIOS")
+    print("="*80)
+
+    start_time = time.time()
+
+    results_df = run_batch(range(1, 21))
+
+    # Save detailed results
+    results_df.to_csv('batch_results_all_scenarios.csv', index=False)
+
+    # Generate summary statistics
+    print("\n" + "="*80)
+    print("AGGREGATE ANALYSIS")
+    print("="*80)
+
+    print(f"\nScenarios completed: {len(results_df)}/20")
+
+    print(f"\n📊 PLACEMENT PERFORMANCE:")
+    print(f"  Average placement rate: {results_df['placement_rate'].mean():.2f}%")
+    print(f"  Best: {results_df['placement_rate'].max():.2f}%")
+    print(f"  Worst: {results_df['placement_rate'].min():.2f}%")
+    print(f"  Std deviation: {results_df['placement_rate'].std():.2f}%")
+    print(f"  Average gap to pre-flight bound: {results_df['placement_rate_gap'].mean():.2f}%")
+
+    print(f"\n📦 UTILIZATION:")
+    print(f"  Average slot utilization: {results_df['slot_utilization'].mean():.2f}%")
+    print(f"  Average TEU loaded: {results_df['total_teu'].mean():.0f}")
+
+    print(f"\n⚓ STABILITY:")
+    print(f"  Average GM: {results_df['gm'].mean():.3f}m")
+    print(f"  Minimum GM: {results_df['gm'].min():.3f}m")
+    print(f"  All stable: {results_df['is_stable'].all()}")
+    print(f"  Average margin: {results_df['stability_margin'].mean():.3f}m")
+
+    print(f"\n⚖️ WEIGHT:")
+    print(f"  Average loaded: {results_df['total_weight'].mean():.1f}t")
+    print(f"  Maximum loaded: {results_df['total_weight'].max():.1f}t")
+
+    print(f"\n⏱️ PERFORMANCE:")
+    print(f"  Total time: {time.time() - start_time:.1f} seconds")
+    print(f"  Avg per scenario: {(time.time() - start_time)/len(results_df):.1f} seconds")
+
+    print(f"\n✅ Results saved to 'batch_results_all_scenarios.csv'")
@@ -0,0 +1,133 @@
+"""
+Bounded background job queue for CPU-bound optimizations
+"""
+from concurrent.futures import ProcessPoolExecutor
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds max_pending unfinished jobs"""
+
+
+class Job:
+    """One submitted optimization and its outcome"""
+
+    def __init__(self, job_id, params):
+        self.job_id = job_id
+        self.params = params
+        self.future = None
+        self.cancelled = False
+        self.submitted_at = time.time()
+        self.finished_at = None
+
+    @property
+    def status(self):
+        """'queued', 'running', 'done', 'failed' or 'cancelled'"""
+        # The pool can cancel a queued future on its own (shutdown with
+        # cancel_futures), without going through JobQueue.cancel
+        if self.cancelled or self.future.cancelled():
+            return 'cancelled'
+        if self.future.done():
+            return 'failed' if self.future.exception() else 'done'
+        if self.future.running():
+            return 'running'
+        return 'queued'
+
+    def to_dict(self, include_result=True):
+        info = {
+            'job_id': self.job_id,
+            'status': self.status,
+            'params': self.params,
+            'submitted_at': self.submitted_at,
+            'finished_at': self.finished_at,
+        }
+        if self.status == 'failed':
+            info['error'] = str(self.future.exception())
+        elif self.status == 'done' and include_result:
+            info['result'] = self.future.result()
+        return info
+
+
+class JobQueue:
+    """
+    Runs jobs in a process pool with a cap on unfinished work
+
+    Submitting while max_pending jobs are queued or running raises
+    QueueFullError so callers can push back instead of piling up work.
+    """
+
+    def __init__(self, func, max_workers=None, max_pending=16, max_finished=256,
+                 initializer=None):
+        """
+        Args:
+            func: Picklable function run for each job with the job's params
+            max_workers: Process pool size (defaults to CPU count)
+            max_pending: Max queued + running jobs before rejecting
+            max_finished: Finished jobs kept for polling before the oldest are dropped
+            initializer: Called once in each worker (e.g. to preload templates)
+        """
+        self.func = func
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self.pool = ProcessPoolExecutor(max_workers=max_workers, initializer=initializer)
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _unfinished(self):
+        """Jobs still holding a queue or worker slot (including cancelled running ones)"""
+        return sum(1 for job in self.jobs.values() if not job.future.done())
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond max_finished"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.future.done()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job_id]
+
+    def submit(self, **params):
+        """Queue a job and return it (raises QueueFullError when full)"""
+        with self.lock:
+            if self._unfinished() >= self.max_pending:
+                raise QueueFullError(f"{self.max_pending} jobs already pending")
+
+            job = Job(uuid.uuid4().hex, params)
+            job.future = self.pool.submit(self.func, **params)
+            job.future.add_done_callback(lambda _: job.finished_at or setattr(job, 'finished_at', time.time()))
+            self.jobs[job.job_id] = job
+            self._prune()
+            return job
+
+    def get(self, job_id):
+        """Look up a job (None if unknown or pruned)"""
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        Cancel a job
+
+        Queued jobs never start. A job that is already running finishes
+        in its worker, but its result is discarded.
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status in ('queued', 'running'):
+                job.future.cancel()
+                job.cancelled = True
+                job.finished_at = time.time()
+            return job
+
+    def stats(self):
+        with self.lock:
+            return {
+                'pending': self._unfinished(),
+                'max_pending': self.max_pending,
+                'tracked': len(self.jobs),
+            }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
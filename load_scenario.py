@@ -2,15 +2,14 @@
 Load and optimize from your synthetic datasets
 """
 import pandas as pd
-from py3dbc.maritime.container import MaritimeContainer
-from py3dbc.maritime.ship import ContainerShip
+import os
+from py3dbc.maritime.ship import ContainerShip, ShipTemplateRegistry
 from py3dbc.maritime.packer import MaritimePacker
+from py3dbc.maritime.observers import ConsoleObserver
+from manifest_store import get_manifest_store
 
-def load_ship_from_specs(ship_specs_path='ship_specifications.csv'):
-    """Load ship specifications"""
-    df = pd.read_csv(ship_specs_path)
-    specs = df.iloc[0].to_dict()
-    
+def build_ship(specs):
+    """Build the feeder ship from a ship specifications row"""
     stability_params = {
         'kg_lightship': specs['kg_lightship'],
         'lightship_weight': specs['lightship_weight'],
@@ -19,7 +18,7 @@ def load_ship_from_specs(ship_specs_path='ship_specifications.csv'):
         'gm_min': specs['gm_min']
     }
     
-    ship = ContainerShip(
+    return ContainerShip(
         ship_name='FEEDER_01',
         dimensions=(specs['length'], specs['beam'], specs['draft'] * 2),
         bays=7,  # From your generation script
@@ -28,33 +27,38 @@ def load_ship_from_specs(ship_specs_path='ship_specifications.csv'):
         stability_params=stability_params,
         max_weight=specs['deadweight']
     )
+
+ship_templates = ShipTemplateRegistry()
+_specs_cache = {}
+
+def read_ship_specs(ship_specs_path='ship_specifications.csv'):
+    """Read ship specifications, cached until the file changes"""
+    key = (os.path.abspath(ship_specs_path), os.stat(ship_specs_path).st_mtime_ns)
+    if key not in _specs_cache:
+        df = pd.read_csv(ship_specs_path)
+        _specs_cache[key] = df.iloc[0].to_dict()
+    return key, dict(_specs_cache[key])
+
+def load_ship_from_specs(ship_specs_path='ship_specifications.csv'):
+    """Load ship specifications"""
+    key, specs = read_ship_specs(ship_specs_path)
+    ship = ship_templates.get(key, factory=lambda: build_ship(specs))
     
     return ship, specs
 
 def load_scenario_containers(scenario_id, manifests_path='container_manifests.csv'):
-    """Load containers for specific scenario"""
-    df = pd.read_csv(manifests_path)
-    scenario_df = df[df['scenario_id'] == scenario_id]
-    
-    containers = []
-    for _, row in scenario_df.iterrows():
-        container = MaritimeContainer(
-            container_id=row['container_id'],
-            teu_size=row['size'],
-            cargo_type=row['cargo_type'],
-            total_weight=row['total_weight'],
-            dimensions=(row['length'], row['width'], row['height']),
-            empty_weight=row['empty_weight'],
-            destination=row['destination'],
-            hazmat_class='Class_3' if row['cargo_type'] == 'hazmat' else None,
-            loading_priority=row['loading_priority']
-        )
-        containers.append(container)
-    
-    return containers
+    """Load containers for specific scenario from the columnar manifest cache"""
+    return get_manifest_store(manifests_path).load_containers(scenario_id)
 
-def optimize_scenario(scenario_id):
-    """Run optimization for a specific scenario"""
+def optimize_scenario(scenario_id, observer=None):
+    """
+    Run optimization for a specific scenario
+    
+    Args:
+        scenario_id: Scenario to load from the manifest
+        observer: PackingObserver for per-container progress
+                  (prints to console if None)
+    """
     print("=" * 80)
     print(f"OPTIMIZING SCENARIO {scenario_id}")
     print("=" * 80)
@@ -81,7 +85,10 @@ def optimize_scenario(scenario_id):
     print(f"  Total TEU: {sum(c.teu_value for c in containers)}")
     
     # Optimize
-    packer = MaritimePacker(ship, gm_threshold=ship.gm_min, hazmat_separation=3)
+    packer = MaritimePacker(
+        ship, gm_threshold=ship.gm_min, hazmat_separation=3,
+        observer=observer or ConsoleObserver()
+    )
     result = packer.pack(containers, strategy='heavy_first')
     
     # Results
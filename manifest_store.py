@@ -0,0 +1,244 @@
+"""
+Columnar manifest cache - parse container_manifests.csv once, slice by scenario
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from py3dbc.maritime.container import MaritimeContainer
+from py3dbc.maritime.preflight import feasibility_bounds
+
+CACHE_VERSION = 1
+
+# Columns stored as plain numeric arrays
+NUMERIC_COLUMNS = {
+    'length': np.float64,
+    'width': np.float64,
+    'height': np.float64,
+    'empty_weight': np.float64,
+    'total_weight': np.float64,
+    'loading_priority': np.int64,
+}
+
+# Low-cardinality text columns stored as codes + category list
+CATEGORY_COLUMNS = ('size', 'cargo_type', 'destination')
+
+
+class ManifestStore:
+    """
+    Memory-mapped columnar cache of the container manifest
+
+    The CSV is converted once into one .npy file per column, with rows
+    grouped by scenario_id and an offset index per scenario. The cache
+    is rebuilt whenever the CSV's size or modification time changes.
+    """
+
+    def __init__(self, manifests_path='container_manifests.csv', cache_dir=None):
+        """
+        Args:
+            manifests_path: Manifest CSV
+            cache_dir: Cache directory (defaults to <manifest>.cache next to the CSV)
+        """
+        self.manifests_path = manifests_path
+        self.cache_dir = cache_dir or os.path.splitext(manifests_path)[0] + '.cache'
+        self._columns = None
+        self._signature = None
+        self._digests = {}
+
+    def _source_signature(self):
+        """Size and mtime of the CSV, used to detect changes"""
+        stat = os.stat(self.manifests_path)
+        return {'version': CACHE_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def _read_meta(self):
+        try:
+            with open(os.path.join(self.cache_dir, 'meta.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def build(self):
+        """Parse the CSV and write the columnar cache"""
+        signature = self._source_signature()
+        df = pd.read_csv(self.manifests_path)
+
+        order = np.argsort(df['scenario_id'].to_numpy(), kind='stable')
+        df = df.iloc[order]
+
+        scenario_ids = df['scenario_id'].to_numpy(dtype=np.int64)
+        ids, starts, counts = np.unique(scenario_ids, return_index=True, return_counts=True)
+
+        arrays = {'container_id': df['container_id'].to_numpy(dtype=str)}
+        for name, dtype in NUMERIC_COLUMNS.items():
+            arrays[name] = df[name].to_numpy(dtype=dtype)
+
+        categories = {}
+        for name in CATEGORY_COLUMNS:
+            codes, uniques = pd.factorize(df[name])
+            arrays[name] = codes.astype(np.int16)
+            categories[name] = [str(value) for value in uniques]
+
+        meta = dict(signature)
+        meta['categories'] = categories
+        meta['index'] = {
+            str(scenario_id): [int(start), int(start + count)]
+            for scenario_id, start, count in zip(ids, starts, counts)
+        }
+
+        # Write to a private directory next to the final location, then
+        # swap it in. Several processes may rebuild at once; each writes
+        # its own directory and any complete cache that lands wins.
+        parent = os.path.dirname(os.path.abspath(self.cache_dir))
+        tmp_dir = tempfile.mkdtemp(prefix=os.path.basename(self.cache_dir) + '.', dir=parent)
+        try:
+            for name, values in arrays.items():
+                np.save(os.path.join(tmp_dir, f'{name}.npy'), values)
+            with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+                json.dump(meta, f)
+            self._swap_in(tmp_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        self._columns = None
+        return meta
+
+    def _swap_in(self, tmp_dir):
+        """Move a finished cache directory into place, replacing a stale one"""
+        stale = None
+        if os.path.isdir(self.cache_dir):
+            # os.replace cannot overwrite a non-empty directory, so move
+            # the old cache aside first (atomically, under a private name)
+            stale = tempfile.mkdtemp(prefix=os.path.basename(self.cache_dir) + '.stale.',
+                                     dir=os.path.dirname(tmp_dir))
+            try:
+                os.replace(self.cache_dir, os.path.join(stale, 'cache'))
+            except FileNotFoundError:
+                pass  # another process moved it first
+        try:
+            os.replace(tmp_dir, self.cache_dir)
+        except OSError:
+            # Lost the race: another process swapped in its cache after
+            # ours was moved aside. Its data comes from the same CSV.
+            if not os.path.isdir(self.cache_dir):
+                raise
+        finally:
+            if stale:
+                shutil.rmtree(stale, ignore_errors=True)
+
+    def _open(self):
+        """Memory-map the cache, rebuilding it if the CSV changed"""
+        signature = self._source_signature()
+        if self._columns is not None and self._signature == signature:
+            return
+
+        meta = self._read_meta()
+        if not meta or any(meta.get(key) != value for key, value in signature.items()):
+            meta = self.build()
+
+        try:
+            self._columns = self._load_columns()
+        except OSError:
+            # Another process swapped the cache out between meta and columns
+            meta = self.build()
+            self._columns = self._load_columns()
+        self._categories = meta['categories']
+        self._index = {int(key): tuple(bounds) for key, bounds in meta['index'].items()}
+        self._signature = signature
+
+    def _load_columns(self):
+        names = ('container_id',) + tuple(NUMERIC_COLUMNS) + CATEGORY_COLUMNS
+        return {
+            name: np.load(os.path.join(self.cache_dir, f'{name}.npy'), mmap_mode='r')
+            for name in names
+        }
+
+    def scenario_ids(self):
+        """Scenario IDs present in the manifest"""
+        self._open()
+        return sorted(self._index)
+
+    def scenario_sizes(self):
+        """Number of manifest rows per scenario ID"""
+        self._open()
+        return {scenario_id: end - start for scenario_id, (start, end) in sorted(self._index.items())}
+
+    def scenario_columns(self, scenario_id):
+        """
+        Column arrays for one scenario
+
+        Returns:
+            dict: column name -> array slice (category columns decoded to str)
+        """
+        self._open()
+        start, end = self._index.get(int(scenario_id), (0, 0))
+
+        columns = {name: self._columns[name][start:end] for name in ('container_id',) + tuple(NUMERIC_COLUMNS)}
+        for name in CATEGORY_COLUMNS:
+            labels = np.array(self._categories[name])
+            columns[name] = labels[self._columns[name][start:end]]
+        return columns
+
+    def scenario_digest(self, scenario_id):
+        """
+        Content hash of one scenario's rows
+
+        Changes only when that scenario's data changes, not when other
+        scenarios or the file's mtime do.
+        """
+        self._open()
+        key = (self._signature['size'], self._signature['mtime_ns'], int(scenario_id))
+        if key not in self._digests:
+            columns = self.scenario_columns(scenario_id)
+            digest = hashlib.sha1()
+            for name in sorted(columns):
+                digest.update(name.encode())
+                digest.update(np.ascontiguousarray(columns[name]).tobytes())
+            self._digests[key] = digest.hexdigest()
+        return self._digests[key]
+
+    def scenario_bounds(self, scenario_id, ship, gm_threshold=None):
+        """Pre-flight feasibility bounds for one scenario, straight from its columns"""
+        columns = self.scenario_columns(scenario_id)
+        teu = np.where(columns['size'] == '40ft', 2, 1)
+        return feasibility_bounds(ship, columns['total_weight'], columns['cargo_type'], teu, gm_threshold)
+
+    def load_containers(self, scenario_id):
+        """Build MaritimeContainers for one scenario from its column slice"""
+        columns = self.scenario_columns(scenario_id)
+
+        containers = []
+        for container_id, size, cargo_type, total_weight, length, width, height, \
+                empty_weight, destination, loading_priority in zip(
+                    columns['container_id'].tolist(), columns['size'].tolist(),
+                    columns['cargo_type'].tolist(), columns['total_weight'].tolist(),
+                    columns['length'].tolist(), columns['width'].tolist(),
+                    columns['height'].tolist(), columns['empty_weight'].tolist(),
+                    columns['destination'].tolist(), columns['loading_priority'].tolist()):
+            containers.append(MaritimeContainer(
+                container_id=container_id,
+                teu_size=size,
+                cargo_type=cargo_type,
+                total_weight=total_weight,
+                dimensions=(length, width, height),
+                empty_weight=empty_weight,
+                destination=destination,
+                hazmat_class='Class_3' if cargo_type == 'hazmat' else None,
+                loading_priority=loading_priority
+            ))
+
+        return containers
+
+
+_stores = {}
+
+
+def get_manifest_store(manifests_path='container_manifests.csv'):
+    """Shared ManifestStore per manifest path"""
+    key = os.path.abspath(manifests_path)
+    if key not in _stores:
+        _stores[key] = ManifestStore(manifests_path)
+    return _stores[key]
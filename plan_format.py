@@ -0,0 +1,156 @@
+"""
+Plan response formats - per-container rows or typed columns for the 3D view
+"""
+import json
+import struct
+import zlib
+
+import numpy as np
+
+# ✅ Ship dimensions from ShipHull.tsx:
+# Hull: 60 (length) x 8 (height) x 15 (width)
+# Deck at Y = 4
+# Ship layout: 7 bays x 14 rows x 7 tiers
+
+SHIP_LENGTH = 60.0
+SHIP_WIDTH = 15.0
+DECK_HEIGHT = 4.0
+
+# Calculate spacing to fit containers within ship bounds
+BAY_SPACING = SHIP_LENGTH / 7  # ≈ 8.57 units per bay
+ROW_SPACING = SHIP_WIDTH / 14   # ≈ 1.07 units per row
+TIER_HEIGHT = 2.6               # Standard container height
+
+# Accept header values selecting the columnar formats
+COLUMNS_JSON = 'application/vnd.cargooptix.columns+json'
+COLUMNS_BINARY = 'application/vnd.cargooptix.columns'
+
+BINARY_MAGIC = b'COPX'
+COMPRESSED_MAGIC = b'COPZ'
+
+# Decimal places kept for float columns in the JSON column layout
+JSON_DECIMALS = {'weight': 2, 'x': 3, 'y': 3, 'z': 3}
+
+
+def slot_position(slot):
+    """Scene coordinates of a slot for the 3D view"""
+    if not slot:
+        return {"x": 0, "y": 0, "z": 0}
+    return {
+        # X: Distribute 7 bays across ship length (60 units), centered at 0
+        "x": (slot.bay - 3) * BAY_SPACING,
+        # Y: Stack containers starting from deck (Y=4), going upward
+        "y": DECK_HEIGHT + 0.5 + (slot.tier * TIER_HEIGHT),
+        # Z: Distribute 14 rows across ship width (15 units), centered at 0
+        "z": (slot.row - 6.5) * ROW_SPACING,
+    }
+
+
+def plan_columns(ship, placed):
+    """
+    Placed containers as typed column arrays, one entry per container
+
+    Slot geometry is gathered straight from the ship's SlotTable, and
+    scene positions use the same mapping as slot_position().
+
+    Returns:
+        (columns, type_labels): dict of name -> ndarray, and the cargo
+        type names indexed by the 'type_code' column
+    """
+    count = len(placed)
+    index = np.fromiter((c.assigned_slot.index for c in placed), dtype=np.intp, count=count)
+    table = ship.table
+
+    bay = np.frombuffer(table.bay, dtype=np.uint16)[index]
+    row = np.frombuffer(table.row, dtype=np.uint16)[index]
+    tier = np.frombuffer(table.tier, dtype=np.uint16)[index]
+
+    type_labels, type_code = np.unique([c.cargo_type for c in placed], return_inverse=True)
+    ids = [c.container_id for c in placed]
+
+    columns = {
+        'id': np.array(ids, dtype=f'S{max(map(len, ids), default=1)}'),
+        'type_code': type_code.astype(np.uint8),
+        'teu': np.fromiter((c.teu_value for c in placed), dtype=np.uint8, count=count),
+        'weight': np.fromiter((c.total_weight for c in placed), dtype=np.float32, count=count),
+        'bay': bay,
+        'row': row,
+        'tier': tier,
+        'x': ((bay - 3.0) * BAY_SPACING).astype(np.float32),
+        'y': (DECK_HEIGHT + 0.5 + tier * TIER_HEIGHT).astype(np.float32),
+        'z': ((row - 6.5) * ROW_SPACING).astype(np.float32),
+    }
+    return columns, [str(label) for label in type_labels]
+
+
+def columns_to_json(plan):
+    """Columnar plan with every array turned into a JSON list"""
+    columns = {}
+    for name, values in plan['columns'].items():
+        if values.dtype.kind == 'S':
+            values = values.astype(str)
+        elif name in JSON_DECIMALS:
+            # float32 -> float64 would print 8.571428298950195
+            values = np.round(values.astype(np.float64), JSON_DECIMALS[name])
+        columns[name] = values.tolist()
+    return dict(plan, columns=columns)
+
+
+def encode_columns(plan, compress=True):
+    """
+    Pack a columnar plan into one binary buffer
+
+    Layout: b'COPX', uint32 header length, UTF-8 JSON header, then each
+    column's raw little-endian bytes, every section 8-byte aligned so a
+    client can view it directly as a typed array. The header holds all
+    non-column fields plus, per column, its dtype, byte offset and length.
+
+    With compress, that buffer is zlib-deflated behind b'COPZ' (ids and
+    grid columns compress about 4x). The client inflates it, e.g. with
+    DecompressionStream('deflate'), and views the result as above.
+    """
+    header = {key: value for key, value in plan.items() if key != 'columns'}
+    layout = []
+    offset = 0
+    for name, values in plan['columns'].items():
+        values = np.ascontiguousarray(values)
+        layout.append({
+            'name': name,
+            'dtype': values.dtype.newbyteorder('<').str if values.dtype.kind != 'S' else values.dtype.str,
+            'offset': offset,
+            'length': len(values),
+        })
+        offset += -(-values.nbytes // 8) * 8
+    header['columns'] = layout
+
+    header_bytes = json.dumps(header, default=str).encode()
+    header_bytes += b' ' * (-(len(BINARY_MAGIC) + 4 + len(header_bytes)) % 8)
+
+    chunks = [BINARY_MAGIC, struct.pack('<I', len(header_bytes)), header_bytes]
+    for values in plan['columns'].values():
+        data = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder('<')).tobytes()
+        chunks.append(data + bytes(-len(data) % 8))
+    data = b''.join(chunks)
+    if compress:
+        return COMPRESSED_MAGIC + zlib.compress(data, 6)
+    return data
+
+
+def decode_columns(data):
+    """Inverse of encode_columns (for clients and tests)"""
+    if data[:4] == COMPRESSED_MAGIC:
+        data = zlib.decompress(data[4:])
+    if data[:4] != BINARY_MAGIC:
+        raise ValueError("Not a columnar plan")
+    (header_length,) = struct.unpack_from('<I', data, 4)
+    start = 8 + header_length
+    header = json.loads(data[8:start])
+
+    columns = {}
+    for column in header['columns']:
+        dtype = np.dtype(column['dtype'])
+        columns[column['name']] = np.frombuffer(
+            data, dtype=dtype, count=column['length'], offset=start + column['offset']
+        )
+    return dict(header, columns=columns)
+
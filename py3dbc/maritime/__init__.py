@@ -3,14 +3,25 @@ Maritime extensions for container ship optimization
 """
 
 from .container import MaritimeContainer
-from .ship import ContainerShip, Slot
+from .ship import ContainerShip, Slot, Stack
+from .slot_table import SlotTable
 from .constraints import MaritimeConstraintChecker
 from .packer import MaritimePacker
+from .improver import PlanImprover
+from .beam import BeamSearch
+from .observers import PackingObserver, ConsoleObserver, BatchingObserver
 
 __all__ = [
     'MaritimeContainer', 
     'ContainerShip', 
     'Slot',
+    'Stack',
+    'SlotTable',
     'MaritimeConstraintChecker',
-    'MaritimePacker'
+    'MaritimePacker',
+    'PlanImprover',
+    'BeamSearch',
+    'PackingObserver',
+    'ConsoleObserver',
+    'BatchingObserver'
 ]
\ No newline at end of file
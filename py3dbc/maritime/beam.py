@@ -0,0 +1,170 @@
+"""
+Beam search over slot choices for MaritimePacker
+"""
+
+
+class BeamNode:
+    """
+    One partial plan, stored as a delta on its parent
+
+    A node records only the decision for its container (slot or None if
+    it failed), so K plans sharing a prefix share it in memory, like a
+    persistent list.
+    """
+    __slots__ = ('parent', 'container', 'slot', 'depth', 'placed', 'score', 'bound')
+
+    def __init__(self, parent, container, slot, score, bound=0):
+        self.parent = parent
+        self.container = container
+        self.slot = slot
+        self.depth = parent.depth + 1 if parent else 0
+        self.placed = (parent.placed if parent else 0) + (1 if slot else 0)
+        self.score = (parent.score if parent else 0.0) + score
+        self.bound = bound
+
+    def path(self):
+        """Decisions from the root to this node, oldest first"""
+        nodes = []
+        node = self
+        while node.parent is not None:
+            nodes.append(node)
+            node = node.parent
+        nodes.reverse()
+        return nodes
+
+
+class BeamSearch:
+    """
+    Keep the beam_width best partial plans while placing containers in order
+
+    Every plan in the beam branches on the top `branching` slots of the
+    next container (or fails it if none is valid). Children are ranked by
+    an admissible bound on the containers their completion can place,
+    then by total slot score. The bound counts every remaining container,
+    except that remaining reefers are capped by the free reefer slots.
+    A child whose bound is below the greedy plan's count is pruned,
+    since no completion could beat the greedy plan.
+
+    One real ship is shared by all plans. Switching to a plan removes the
+    placements since the common ancestor and replays the other branch,
+    so moving between siblings costs one remove and one place instead of
+    copying the ship.
+    """
+
+    def __init__(self, packer, beam_width=4, branching=3):
+        """
+        Args:
+            packer: MaritimePacker providing the ship, checker and slot ranking
+            beam_width: K, partial plans kept per step
+            branching: M, slot choices tried per plan per container
+        """
+        if beam_width < 1 or branching < 1:
+            raise ValueError("beam_width and branching must be at least 1")
+
+        self.packer = packer
+        self.ship = packer.ship
+        self.beam_width = beam_width
+        self.branching = branching
+
+        self.root = BeamNode(None, None, None, 0.0)
+        self.current = self.root
+        self.stats = {'expanded': 0, 'pruned': 0, 'greedy_placed': 0}
+
+    def _place(self, container, slot):
+        self.ship.place_container_in_slot(container, slot)
+        if self.packer.slot_engine:
+            self.packer.slot_engine.update_slot(slot)
+
+    def _remove(self, container):
+        slot = container.assigned_slot
+        # Backtracking lifts the latest placement, which without the
+        # support rule may sit below an earlier one
+        self.ship.remove_container(container, from_top=self.packer.checker.require_support)
+        if self.packer.slot_engine:
+            self.packer.slot_engine.update_slot(slot)
+
+    def checkout(self, node):
+        """Bring the ship to node's state via the common ancestor"""
+        up, down = self.current, node
+        removals, additions = [], []
+        while up.depth > down.depth:
+            removals.append(up)
+            up = up.parent
+        while down.depth > up.depth:
+            additions.append(down)
+            down = down.parent
+        while up is not down:
+            removals.append(up)
+            additions.append(down)
+            up, down = up.parent, down.parent
+
+        # Newest first, so each removed container is on top of its stack
+        for step in removals:
+            if step.slot:
+                self._remove(step.container)
+        for step in reversed(additions):
+            if step.slot:
+                self._place(step.container, step.slot)
+
+        self.current = node
+
+    def _greedy_placed(self, ordered):
+        """Containers the plain greedy pass places (the pruning incumbent)"""
+        node = self.root
+        for container in ordered:
+            self.checkout(node)
+            best = self.packer._find_best_slot(container)
+            node = BeamNode(node, container, best, 0.0)
+        self.checkout(node)
+        placed = node.placed
+        self.checkout(self.root)
+        return placed
+
+    def search(self, ordered):
+        """
+        Run the beam over containers in the given order
+
+        Returns:
+            BeamNode: the best complete plan (ship is left in its state)
+        """
+        incumbent = self._greedy_placed(ordered)
+        self.stats['greedy_placed'] = incumbent
+
+        # Reefers still to come after each position
+        total = len(ordered)
+        reefers_after = [0] * total
+        count = 0
+        for i in range(total - 1, -1, -1):
+            reefers_after[i] = count
+            count += 1 if ordered[i].is_reefer() and self.packer.checker.check_reefer else 0
+
+        beam = [self.root]
+        for depth, container in enumerate(ordered):
+            remaining = total - depth - 1
+            children = []
+            for node in beam:
+                self.checkout(node)
+                self.stats['expanded'] += 1
+
+                free_reefer = self.ship.count_free_slots(reefer=True)
+                ranked = self.packer._rank_slots(container, self.branching)
+                for slot, score in ranked:
+                    reefer_room = free_reefer - (1 if slot.is_reefer_slot else 0)
+                    bound = node.placed + 1 + remaining - max(0, reefers_after[depth] - reefer_room)
+                    children.append(BeamNode(node, container, slot, score, bound))
+                if not ranked:
+                    bound = node.placed + remaining - max(0, reefers_after[depth] - free_reefer)
+                    children.append(BeamNode(node, container, None, 0.0, bound))
+
+            kept = [child for child in children if child.bound >= incumbent]
+            self.stats['pruned'] += len(children) - len(kept)
+            if not kept:
+                # Nothing can beat greedy; fall back to following it
+                kept = [max(children, key=lambda child: (child.bound, child.score))]
+
+            kept.sort(key=lambda child: (child.bound, child.score), reverse=True)
+            beam = kept[:self.beam_width]
+
+        best = max(beam, key=lambda node: (node.placed, node.score))
+        self.checkout(best)
+        return best
@@ -3,22 +3,217 @@ Maritime constraint checking for container placement
 """
 import math
 
+from py3dbc.maritime.rotation import PortRotation
+
+
+class ConstraintStage:
+    """
+    One registered check in MaritimeConstraintChecker's pipeline
+    
+    Keeps counts of how often it ran and how often it rejected, so the
+    pipeline can run the cheapest, most selective stages first.
+    """
+    __slots__ = ('name', 'check', 'cost', 'cargo_types', 'evaluated', 'rejected')
+    
+    def __init__(self, name, check, cost=1.0, cargo_types=None):
+        """
+        Args:
+            name: Constraint name, reported when the stage rejects a slot
+            check: Callable(container, slot, ship) -> (ok: bool, reason: str)
+            cost: Relative cost of one call (the built-in checks are 1-3)
+            cargo_types: Cargo types the check applies to (None for all)
+        """
+        self.name = name
+        self.check = check
+        self.cost = cost
+        self.cargo_types = cargo_types
+        self.evaluated = 0
+        self.rejected = 0
+    
+    @property
+    def rejection_rate(self):
+        """Observed rejection rate, smoothed so unseen stages start at 1/2"""
+        return (self.rejected + 1) / (self.evaluated + 2)
+    
+    @property
+    def expected_cost(self):
+        """Cost paid per rejection; lower runs earlier"""
+        return self.cost / self.rejection_rate
+
+
+class _StageRun:
+    """A stage's place in one cargo type's pipeline, with unsettled rejections"""
+    __slots__ = ('stage', 'rejected')
+    
+    def __init__(self, stage):
+        self.stage = stage
+        self.rejected = 0
+
+
+class _Pipeline:
+    """
+    The stages that apply to one cargo type, in the checker's order
+    
+    Only calls and rejections are counted per check; how many checks
+    reached each stage is worked out when the counts are settled.
+    """
+    __slots__ = ('calls', 'runs', 'steps')
+    
+    def __init__(self, stages):
+        self.calls = 0
+        self.runs = [_StageRun(stage) for stage in stages]
+        self.steps = tuple((run.stage.check, run) for run in self.runs)
+    
+    def settle(self):
+        """Credit each stage with the checks that reached it"""
+        reached = self.calls
+        for run in self.runs:
+            run.stage.evaluated += reached
+            run.stage.rejected += run.rejected
+            reached -= run.rejected
+            run.rejected = 0
+        self.calls = 0
+
 
 class MaritimeConstraintChecker:
     """
     Validates maritime-specific constraints for container placement
+    
+    Each constraint is a ConstraintStage in a pipeline. A slot is valid
+    when every stage passes, so stage order only decides how quickly an
+    invalid slot is rejected. A container only runs the stages for its
+    cargo type (the reefer check for reefers, separation for hazmats).
+    
+    With adaptive ordering on, the stages are re-sorted whenever a cargo
+    type's pipeline has run REORDER_INTERVAL checks, by cost per observed
+    rejection, with counts halved each time so the order follows the
+    load as the ship fills.
+    
+    More constraints plug in with register(). Stability is not a stage:
+    validate_stability_after_placement also produces the predicted GM
+    the packer scores slots with, so it runs after the pipeline.
     """
     
-    def __init__(self, hazmat_separation=2, check_reefer=True, check_weight=True):
+    REORDER_INTERVAL = 512
+    
+    # Checks the slot engines also apply themselves (as batch masks and
+    # candidate filters); other stages are run slot by slot
+    BUILTIN_STAGES = ('occupied', 'support', 'weight', 'reefer', 'hazmat')
+    
+    def __init__(self, hazmat_separation=2, check_reefer=True, check_weight=True,
+                 require_support=True, adaptive=True):
         """
         Args:
             hazmat_separation: Minimum positions between hazmat containers
             check_reefer: Enforce reefer power slot requirement
-            check_weight: Enforce tier weight limits
+            check_weight: Enforce tier and stack weight limits
+            require_support: Only allow the next free tier of each stack
+            adaptive: Reorder stages by observed rejection rate
         """
         self.hazmat_separation = hazmat_separation
         self.check_reefer = check_reefer
         self.check_weight = check_weight
+        self.require_support = require_support
+        self.adaptive = adaptive
+        
+        self.stages = []
+        self._pipelines = {}
+        self._custom_stages = {}
+        self._reorder_at = self.REORDER_INTERVAL if adaptive else math.inf
+        
+        self.register('occupied', self._occupied_stage, cost=1.0)
+        if require_support:
+            self.register('support', self._support_stage, cost=1.0)
+        if check_weight:
+            self.register('weight', self.check_weight_limit, cost=2.0)
+        if check_reefer:
+            self.register('reefer', self.check_reefer_power, cost=1.0, cargo_types=('reefer',))
+        self.register('hazmat', self.check_hazmat_separation_constraint, cost=3.0, cargo_types=('hazmat',))
+    
+    def register(self, name, check, cost=1.0, cargo_types=None):
+        """
+        Add a constraint to the pipeline
+        
+        Args:
+            name: Unique constraint name
+            check: Callable(container, slot, ship) -> (ok: bool, reason: str);
+                   must be picklable (a function or bound method) for
+                   pack_portfolio's worker processes
+            cost: Relative cost of one call
+            cargo_types: Cargo types the check applies to (None for all)
+            
+        Returns:
+            ConstraintStage: the registered stage
+        """
+        if any(stage.name == name for stage in self.stages):
+            raise ValueError(f"Constraint '{name}' is already registered")
+        
+        self._settle_counts()
+        stage = ConstraintStage(name, check, cost, cargo_types)
+        self.stages.append(stage)
+        self._pipelines = {}
+        self._custom_stages = {}
+        return stage
+    
+    def unregister(self, name):
+        """Remove a registered constraint (built-ins are switched with the flags)"""
+        if name in self.BUILTIN_STAGES:
+            raise ValueError(f"'{name}' is built in; use the checker's flags to turn it off")
+        self._settle_counts()
+        for i, stage in enumerate(self.stages):
+            if stage.name == name:
+                del self.stages[i]
+                self._pipelines = {}
+                self._custom_stages = {}
+                return
+        raise ValueError(f"Unknown constraint '{name}'")
+    
+    def custom_stages(self, cargo_type=None):
+        """Registered stages beyond the built-in checks (those applying to cargo_type if given)"""
+        stages = self._custom_stages.get(cargo_type)
+        if stages is None:
+            stages = self._custom_stages[cargo_type] = [
+                stage for stage in self.stages
+                if stage.name not in self.BUILTIN_STAGES
+                and (cargo_type is None or stage.cargo_types is None or cargo_type in stage.cargo_types)
+            ]
+        return stages
+    
+    def _pipeline(self, cargo_type):
+        """Pipeline of the stages applying to cargo_type (built on first use)"""
+        self._pipelines[cargo_type] = _Pipeline([
+            stage for stage in self.stages
+            if stage.cargo_types is None or cargo_type in stage.cargo_types
+        ])
+        return self._pipelines[cargo_type]
+    
+    def _settle_counts(self):
+        for pipeline in self._pipelines.values():
+            pipeline.settle()
+    
+    def reorder(self):
+        """Sort stages by expected cost per rejection and age the counts"""
+        self._settle_counts()
+        self.stages.sort(key=lambda stage: stage.expected_cost)
+        for stage in self.stages:
+            stage.evaluated //= 2
+            stage.rejected //= 2
+        self._pipelines = {}
+        self._custom_stages = {}
+    
+    def pipeline_stats(self):
+        """Stages in their current order with cost and observed rejection rate"""
+        self._settle_counts()
+        return [
+            {
+                'name': stage.name,
+                'cost': stage.cost,
+                'evaluated': stage.evaluated,
+                'rejected': stage.rejected,
+                'rejection_rate': round(stage.rejection_rate, 4),
+            }
+            for stage in self.stages
+        ]
     
     def check_all_constraints(self, container, slot, ship):
         """
@@ -32,44 +227,87 @@ class MaritimeConstraintChecker:
         Returns:
             tuple: (can_place: bool, reason: str)
         """
-        # Basic slot availability
-        if slot.occupied:
-            return False, "Slot already occupied"
+        constraint, reason = self.find_violation(container, slot, ship)
+        return constraint is None, reason
+    
+    def find_violation(self, container, slot, ship):
+        """
+        First constraint in pipeline order that placing container in
+        slot would break
         
-        # Weight constraint
-        if self.check_weight:
-            can_place, reason = self.check_weight_limit(container, slot)
+        Returns:
+            tuple: (constraint name or None, reason: str)
+        """
+        pipeline = self._pipelines.get(container.cargo_type) or self._pipeline(container.cargo_type)
+        if pipeline.calls >= self._reorder_at:
+            self.reorder()
+            pipeline = self._pipeline(container.cargo_type)
+        pipeline.calls += 1
+        for check, run in pipeline.steps:
+            can_place, reason = check(container, slot, ship)
             if not can_place:
-                return False, reason
+                run.rejected += 1
+                return run.stage.name, reason
         
-        # Reefer constraint
-        if self.check_reefer:
-            can_place, reason = self.check_reefer_power(container, slot)
-            if not can_place:
-                return False, reason
+        return None, "All constraints satisfied"
+    
+    def filter_slots(self, container, slots, ship):
+        """
+        Slots from slots that pass every constraint for container
         
-        # Hazmat separation
-        if container.is_hazmat():
-            can_place, reason = self.check_hazmat_separation_constraint(
-                container, slot, ship
-            )
-            if not can_place:
-                return False, reason
+        Same result as check_all_constraints on each slot, but runs the
+        pipeline a stage at a time over the whole list, so each stage's
+        survivors are the next stage's input.
+        """
+        pipeline = self._pipelines.get(container.cargo_type) or self._pipeline(container.cargo_type)
+        if pipeline.calls >= self._reorder_at:
+            self.reorder()
+            pipeline = self._pipeline(container.cargo_type)
+        pipeline.calls += len(slots)
+        
+        for check, run in pipeline.steps:
+            if not slots:
+                break
+            passed = [slot for slot in slots if check(container, slot, ship)[0]]
+            run.rejected += len(slots) - len(passed)
+            slots = passed
+        
+        return slots
+    
+    # Built-in stages
+    
+    def _occupied_stage(self, container, slot, ship):
+        if slot.occupied:
+            return False, "Slot already occupied"
+        return True, "Slot free"
+    
+    def _support_stage(self, container, slot, ship):
+        if slot.stack and slot is not slot.stack.next_slot:
+            return False, "No support below"
         
-        return True, "All constraints satisfied"
+        return True, "Support OK"
+    
+    # The checks below double as stages, so they take (container, slot, ship)
     
-    def check_weight_limit(self, container, slot):
+    def check_weight_limit(self, container, slot, ship=None):
         """Check if container weight is within slot limits"""
         if container.total_weight > slot.max_tier_weight:
             return False, f"Container too heavy ({container.total_weight}t > {slot.max_tier_weight}t)"
         
-        # Check cumulative stack weight
+        # Check cumulative stack weight, here and on every slot below
         if slot.current_stack_weight + container.total_weight > slot.max_stack_weight:
             return False, f"Stack weight limit exceeded"
         
+        if slot.stack and slot.tier > slot.stack.height and not slot.stack.can_support(container.total_weight):
+            return False, f"Stack weight limit exceeded"
+        
         return True, "Weight OK"
     
-    def check_reefer_power(self, container, slot):
+    def check_support(self, slot):
+        """Check that slot is the next free tier of its stack"""
+        return self._support_stage(None, slot, None)
+    
+    def check_reefer_power(self, container, slot, ship=None):
         """Check if reefer container has power availability"""
         if container.is_reefer() and not slot.is_reefer_slot:
             return False, "Reefer container requires powered slot"
@@ -80,17 +318,15 @@ class MaritimeConstraintChecker:
         """
         Check minimum separation distance from other hazmat containers
         
-        Uses Manhattan distance in bay/row/tier space
+        Uses Manhattan distance in bay/row/tier space, looked up in the
+        ship's hazmat exclusion index
         """
-        for placed_container in ship.placed_containers:
-            if placed_container.is_hazmat():
-                placed_slot = placed_container.assigned_slot
-                
-                # Calculate distance in slot positions
-                distance = self._calculate_slot_distance(slot, placed_slot)
-                
-                if distance < self.hazmat_separation:
-                    return False, f"Too close to hazmat container {placed_container.container_id}"
+        if not container.is_hazmat():
+            return True, "Not hazmat"
+        
+        if ship.is_hazmat_blocked(slot, self.hazmat_separation):
+            placed_container = ship.find_nearby_hazmat(slot, self.hazmat_separation)
+            return False, f"Too close to hazmat container {placed_container.container_id}"
         
         return True, "Hazmat separation OK"
     
@@ -137,23 +373,8 @@ class MaritimeConstraintChecker:
         Returns:
             tuple: (is_stable: bool, gm_value: float)
         """
-        # Simulate placement
-        total_moment = ship.kg_lightship * ship.lightship_weight
-        total_weight = ship.lightship_weight
-        
-        # Add existing containers
-        for placed in ship.placed_containers:
-            if placed.assigned_slot:
-                total_moment += placed.total_weight * placed.assigned_slot.z_pos
-                total_weight += placed.total_weight
-        
-        # Add new container
-        total_moment += container.total_weight * slot.z_pos
-        total_weight += container.total_weight
-        
-        # Calculate new KG and GM
-        new_kg = total_moment / total_weight
-        new_gm = ship.kb + ship.bm - new_kg
+        # Simulate placement against the ship's running totals
+        new_gm = ship.predict_gm(container.total_weight, slot.z_pos)
         
         is_stable = new_gm >= gm_threshold
         
@@ -163,21 +384,48 @@ class MaritimeConstraintChecker:
 class LoadingSequenceValidator:
     """
     Validates loading sequence for multi-port operations
-    (Future extension - not critical for Review III)
+    
+    With a port sequence, a container is accessible when nothing above
+    it discharges later. Without one, anything above blocks it.
     """
     
-    def __init__(self):
-        self.port_sequence = []
+    def __init__(self, port_sequence=None):
+        """
+        Args:
+            port_sequence: Ports in discharge order (see PortRotation)
+        """
+        self.port_sequence = list(port_sequence or [])
+        self.rotation = PortRotation(self.port_sequence) if self.port_sequence else None
     
     def check_accessibility(self, container, slot, ship):
         """
         Check if container can be accessed for discharge
         without moving other containers
         """
-        # Simplified: Just check if anything is on top
-        if slot.tier < ship.tiers:
-            slot_above = ship.get_slot(slot.bay, slot.row, slot.tier + 1)
-            if slot_above and slot_above.occupied:
+        for tier in range(slot.tier + 1, ship.tiers + 1):
+            slot_above = ship.get_slot(slot.bay, slot.row, tier)
+            if not (slot_above and slot_above.occupied):
+                continue
+            above = slot_above.container
+            if self.rotation is None:
                 return False, "Container blocked by container above"
+            if self.rotation.discharge_index(above) > self.rotation.discharge_index(container):
+                return False, f"Blocked by {above.container_id} (discharges at {above.destination})"
+        
+        return True, "Accessible"
+    
+    def check_no_overstow(self, container, slot, ship):
+        """
+        Reject slots where container would bury boxes discharging earlier
+        
+        Register it on a MaritimeConstraintChecker to make overstows a
+        hard constraint instead of a score penalty.
+        """
+        if self.rotation is None or slot.stack is None:
+            return True, "No port sequence"
+        
+        overstows = self.rotation.overstows(container, slot.stack)
+        if overstows:
+            return False, f"Would overstow {overstows} container(s) discharging earlier"
         
-        return True, "Accessible"
\ No newline at end of file
+        return True, "No overstow"
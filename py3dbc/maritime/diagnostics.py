@@ -0,0 +1,119 @@
+"""
+Failure diagnostics - why containers found no slot
+"""
+import numpy as np
+
+from py3dbc.maritime.vectorized import VectorizedSlotEngine
+
+
+class FailureDiagnostics:
+    """
+    Explains failed placements after packing, on demand
+
+    Every slot is checked against every constraint at once with the
+    vectorized engine's masks, so the hot path never pays for it.
+    Diagnoses reflect the ship as it is now (the finished plan), not
+    the moment each container was tried. A container can fit now when
+    stacks grew out of a hazmat exclusion zone after it failed; it then
+    has feasible_slots > 0 and its near miss breaks nothing (improve()
+    would place it).
+    """
+
+    def __init__(self, packer):
+        """
+        Args:
+            packer: MaritimePacker whose ship, checker and GM threshold to use
+        """
+        self.packer = packer
+        self.ship = packer.ship
+        self.checker = packer.checker
+        self.engine = packer.slot_engine or VectorizedSlotEngine(packer)
+
+    def diagnose(self, container):
+        """
+        Diagnose one container against every slot
+
+        Returns:
+            dict: {
+                'feasible_slots': slots breaking no constraint,
+                'binding': slots per constraint that fails first in check order,
+                'violations': slots breaking each constraint,
+                'sole': slots where the constraint is the only one broken,
+                'near_miss': the slot closest to fitting, with what it breaks
+            }
+        """
+        masks = self.engine.violation_masks(container)
+        names = list(masks)
+        broken = np.stack([masks[name] for name in names])
+        broken_count = broken.sum(axis=0)
+        first = np.argmax(broken, axis=0)
+        failing = broken_count > 0
+
+        return {
+            'container_id': container.container_id,
+            'cargo_type': container.cargo_type,
+            'weight': container.total_weight,
+            'slots': int(broken.shape[1]),
+            'feasible_slots': int((~failing).sum()),
+            'binding': {name: int((failing & (first == i)).sum()) for i, name in enumerate(names)},
+            'violations': {name: int(broken[i].sum()) for i, name in enumerate(names)},
+            'sole': {name: int((broken[i] & (broken_count == 1)).sum()) for i, name in enumerate(names)},
+            'near_miss': self._near_miss(container, names, broken, broken_count),
+        }
+
+    def diagnose_all(self, containers):
+        """Diagnoses keyed by container ID"""
+        return {container.container_id: self.diagnose(container) for container in containers}
+
+    def _severity(self, container, names, broken):
+        """How badly each slot misses: 1 per broken yes/no rule, fractional for weight and GM"""
+        severity = broken.sum(axis=0).astype(np.float64)
+        if 'weight' in names:
+            excess = np.maximum(self.engine.weight_excess(container.total_weight), 0)
+            severity += excess / container.total_weight - broken[names.index('weight')]
+        gm = self.engine.predict_gm(container.total_weight, np.arange(broken.shape[1]))
+        threshold = self.packer.gm_threshold
+        deficit = np.maximum(threshold - gm, 0) / max(threshold, 0.01)
+        severity += deficit - broken[names.index('stability')]
+        return severity, gm
+
+    def _near_miss(self, container, names, broken, broken_count):
+        """Slot with the fewest broken constraints, then the smallest shortfall, free slots first"""
+        severity, gm = self._severity(container, names, broken)
+        index = int(np.lexsort((broken[names.index('occupied')], severity, broken_count))[0])
+        slot = self.ship.slots[index]
+
+        return {
+            'slot': slot.slot_id,
+            'bay': slot.bay,
+            'row': slot.row,
+            'tier': slot.tier,
+            'predicted_gm': round(float(gm[index]), 3),
+            'violations': [
+                {'constraint': name, 'detail': self._detail(name, container, slot, gm[index])}
+                for i, name in enumerate(names) if broken[i, index]
+            ],
+        }
+
+    def _detail(self, name, container, slot, predicted_gm):
+        """Human-readable reason slot breaks constraint name"""
+        if name == 'occupied':
+            return f"Holds {slot.container.container_id}"
+        if name == 'support':
+            return f"Tier {slot.tier} is above the stack's next free tier {slot.stack.next_free_tier}"
+        if name == 'weight':
+            excess = float(self.engine.weight_excess(container.total_weight)[slot.index])
+            return f"{excess:.2f}t over the slot or stack weight limit"
+        if name == 'reefer':
+            return "No reefer power"
+        if name == 'hazmat':
+            separation = self.checker.hazmat_separation
+            neighbour = self.ship.find_nearby_hazmat(slot, separation)
+            return f"Within {separation} of hazmat {neighbour.container_id}"
+        if name == 'stability':
+            return f"GM would drop to {predicted_gm:.3f}m (minimum {self.packer.gm_threshold}m)"
+
+        for stage in self.checker.custom_stages():
+            if stage.name == name:
+                return stage.check(container, slot, self.ship)[1]
+        return name
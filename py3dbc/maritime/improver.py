@@ -0,0 +1,293 @@
+"""
+Local search improver for finished packing plans
+"""
+import math
+import random
+import time
+
+
+class PlanImprover:
+    """
+    Improve a greedy MaritimePacker plan with simulated annealing
+
+    Works on the packer's ship in place, starting from the plan pack()
+    left there. Each iteration tries one move:
+
+    - insert: place a failed container in its best slot
+    - eject: free a slot for a failed container by lifting the stack
+      from that tier up, then re-place the lifted containers
+    - relocate: move a stack-top container to its best other slot
+    - swap: exchange the slots of two stack-top containers
+
+    Moves are applied with place/remove on the ship, so constraints and
+    GM are evaluated incrementally, inside a ship savepoint so a rejected
+    move rolls back exactly. A move that loses placements is always
+    undone. One that keeps the count is accepted by the annealing
+    rule on GM margin, with the temperature cooling to zero over the
+    budget. The best plan seen is restored at the end.
+    """
+
+    MOVES = ('insert', 'eject', 'relocate', 'swap')
+
+    def __init__(self, packer, time_budget=1.0, max_iterations=None, seed=0,
+                 initial_temperature=0.05):
+        """
+        Args:
+            packer: MaritimePacker whose ship holds the plan to improve
+            time_budget: Seconds to search (None for no time limit)
+            max_iterations: Max moves to try (None for no iteration limit)
+            seed: Random seed for move selection
+            initial_temperature: Starting temperature in metres of GM margin
+        """
+        if time_budget is None and max_iterations is None:
+            raise ValueError("Set time_budget or max_iterations")
+
+        self.packer = packer
+        self.ship = packer.ship
+        self.checker = packer.checker
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+        self.random = random.Random(seed)
+        self.initial_temperature = initial_temperature
+
+    def improve(self, result):
+        """
+        Search from a pack() result and return the improved result
+
+        The returned dict has the pack() keys plus 'improvement' with the
+        before/after placement rate and GM margin and accepted move counts.
+        """
+        self.placed = dict.fromkeys(result['placed'])
+        self.failed = dict.fromkeys(result['failed'])
+        before = result['metrics']
+
+        best_score = self._score()
+        best_plan = self._snapshot()
+        accepted = dict.fromkeys(self.MOVES, 0)
+
+        start = time.perf_counter()
+        iterations = 0
+        while True:
+            progress = self._progress(iterations, time.perf_counter() - start)
+            if progress >= 1:
+                break
+            iterations += 1
+
+            move = self._choose_move()
+            if getattr(self, f'_{move}')(self.initial_temperature * (1 - progress)):
+                accepted[move] += 1
+                score = self._score()
+                if score > best_score:
+                    best_score = score
+                    best_plan = self._snapshot()
+
+        if self._score() < best_score:
+            self._restore(best_plan)
+
+        placed, failed = list(self.placed), list(self.failed)
+        metrics = self.packer._calculate_metrics(placed, failed)
+        if self.packer.log_placements:
+            # The log still describes the greedy plan the search started from
+            self.packer.placement_log = self.packer.replay_log(placed)
+
+        return {
+            'success': not failed,
+            'placed': placed,
+            'failed': failed,
+            'metrics': metrics,
+            'placement_log': self.packer.placement_log,
+            'improvement': {
+                'iterations': iterations,
+                'elapsed': round(time.perf_counter() - start, 3),
+                'accepted_moves': accepted,
+                'placement_rate': (before['placement_rate'], metrics['placement_rate']),
+                'stability_margin': (before['stability_margin'], metrics['stability_margin']),
+                'placed_gain': metrics['placed_containers'] - before['placed_containers'],
+            }
+        }
+
+    def _progress(self, iterations, elapsed):
+        """Fraction of the budget used, 1 when exhausted"""
+        progress = 0.0
+        if self.time_budget is not None:
+            progress = elapsed / self.time_budget if self.time_budget > 0 else 1.0
+        if self.max_iterations is not None:
+            progress = max(progress, iterations / self.max_iterations if self.max_iterations > 0 else 1.0)
+        return progress
+
+    def _choose_move(self):
+        if self.failed:
+            return self.random.choices(self.MOVES, weights=(2, 4, 2, 2))[0]
+        return self.random.choice(('relocate', 'swap'))
+
+    # State helpers
+
+    def _margin(self):
+        if not self.ship.placed_containers:
+            return self.ship.kb + self.ship.bm - self.ship.kg_lightship - self.packer.gm_threshold
+        return self.ship.predict_gm(0, 0) - self.packer.gm_threshold
+
+    def _score(self):
+        """Placements first, then GM margin"""
+        return (len(self.placed), round(self._margin(), 6))
+
+    def _snapshot(self):
+        return {container: container.assigned_slot for container in self.placed}
+
+    def _restore(self, plan):
+        """Rebuild the ship with a snapshot's assignments"""
+        for container in sorted(self.placed, key=lambda c: -c.assigned_slot.tier):
+            self._remove(container)
+        for container, slot in sorted(plan.items(), key=lambda item: item[1].tier):
+            self._place(container, slot)
+        self.failed.update(self.placed)
+        self.placed = dict.fromkeys(plan)
+        for container in plan:
+            self.failed.pop(container, None)
+
+    def _touch(self, slot):
+        if self.packer.slot_engine:
+            self.packer.slot_engine.update_slot(slot)
+
+    def _place(self, container, slot):
+        self.ship.place_container_in_slot(container, slot)
+        self._touch(slot)
+
+    def _remove(self, container):
+        slot = container.assigned_slot
+        self.ship.remove_container(container)
+        self._touch(slot)
+        return slot
+
+    def _rollback(self, savepoint):
+        """Undo a rejected move; returns False so moves can `return self._rollback(...)`"""
+        for slot in self.ship.rollback(savepoint):
+            self._touch(slot)
+        self.ship.release(savepoint)
+        return False
+
+    def _fits(self, container, slot):
+        """Constraints and stability for container in slot, as the packer checks them"""
+        can_place, _ = self.checker.check_all_constraints(container, slot, self.ship)
+        if not can_place:
+            return False
+        is_stable, _ = self.checker.validate_stability_after_placement(
+            container, slot, self.ship, self.packer.gm_threshold
+        )
+        return is_stable
+
+    def _accept(self, placed_delta, margin_delta, temperature):
+        """Annealing rule: never lose placements, sometimes accept a lower GM margin"""
+        if self._margin() < 0:
+            return False
+        if placed_delta:
+            return placed_delta > 0
+        if margin_delta >= 0:
+            return True
+        return temperature > 0 and self.random.random() < math.exp(margin_delta / temperature)
+
+    def _stack_tops(self):
+        return [stack.top_container for stack in self.ship.stacks if stack.top_container]
+
+    # Moves
+
+    def _insert(self, temperature):
+        container = self.random.choice(list(self.failed))
+        slot = self.packer._find_best_slot(container)
+        if slot is None:
+            return False
+        self._place(container, slot)
+        del self.failed[container]
+        self.placed[container] = None
+        return True
+
+    def _eject(self, temperature):
+        container = self.random.choice(list(self.failed))
+        table = self.ship.table
+        separation = self.checker.hazmat_separation
+
+        candidates = [
+            slot for slot in self.ship.slots
+            if slot.occupied
+            and (table.is_reefer_slot[slot.index] or not (container.is_reefer() and self.checker.check_reefer))
+            and not (container.is_hazmat() and self.ship.is_hazmat_blocked(slot, separation))
+        ]
+        if not candidates:
+            return False
+        target = self.random.choice(candidates)
+
+        margin_before = self._margin()
+        savepoint = self.ship.savepoint()
+        lifted = [
+            other.container
+            for other in sorted(target.stack.slots, key=lambda s: -s.tier)
+            if other.tier >= target.tier and other.container
+        ]
+        for other in lifted:
+            self._remove(other)
+
+        if not self._fits(container, target):
+            return self._rollback(savepoint)
+        self._place(container, target)
+
+        # Re-place the lifted containers, heaviest first like heavy_first
+        dropped = []
+        for other in sorted(lifted, key=lambda c: c.total_weight, reverse=True):
+            slot = self.packer._find_best_slot(other)
+            if slot is None:
+                dropped.append(other)
+            else:
+                self._place(other, slot)
+
+        if not self._accept(1 - len(dropped), self._margin() - margin_before, temperature):
+            return self._rollback(savepoint)
+
+        self.ship.release(savepoint)
+        del self.failed[container]
+        self.placed[container] = None
+        for other in dropped:
+            del self.placed[other]
+            self.failed[other] = None
+        return True
+
+    def _relocate(self, temperature):
+        tops = self._stack_tops()
+        if not tops:
+            return False
+        container = self.random.choice(tops)
+
+        margin_before = self._margin()
+        savepoint = self.ship.savepoint()
+        origin = self._remove(container)
+        slot = self.packer._find_best_slot(container)
+        if slot is None or slot is origin:
+            return self._rollback(savepoint)
+        self._place(container, slot)
+
+        if not self._accept(0, self._margin() - margin_before, temperature):
+            return self._rollback(savepoint)
+        self.ship.release(savepoint)
+        return True
+
+    def _swap(self, temperature):
+        tops = self._stack_tops()
+        if len(tops) < 2:
+            return False
+        first, second = self.random.sample(tops, 2)
+        if first.total_weight == second.total_weight and first.cargo_type == second.cargo_type:
+            return False
+
+        margin_before = self._margin()
+        savepoint = self.ship.savepoint()
+        first_slot = self._remove(first)
+        second_slot = self._remove(second)
+
+        for container, slot in ((first, second_slot), (second, first_slot)):
+            if not self._fits(container, slot):
+                return self._rollback(savepoint)
+            self._place(container, slot)
+
+        if not self._accept(0, self._margin() - margin_before, temperature):
+            return self._rollback(savepoint)
+        self.ship.release(savepoint)
+        return True
@@ -0,0 +1,128 @@
+"""
+Packing observers - event hooks for MaritimePacker progress
+"""
+import time
+
+
+class PackingObserver:
+    """
+    Receives packing events from MaritimePacker.pack
+
+    Every hook is a no-op; subclass and override the ones you need.
+    """
+
+    def on_start(self, packer, containers, strategy):
+        """Called once with the sorted containers before placement starts"""
+
+    def on_placed(self, step, total, container, slot):
+        """Called after container was placed in slot"""
+
+    def on_failed(self, step, total, container, reason):
+        """Called when no slot could be found for container"""
+
+    def on_finish(self, result):
+        """Called with the pack() result dict"""
+
+
+class ConsoleObserver(PackingObserver):
+    """Prints packing progress to stdout"""
+
+    def on_start(self, packer, containers, strategy):
+        self.ship = packer.ship
+        print(f"\nStarting packing with strategy: {strategy}")
+        print(f"Total containers to place: {len(containers)}")
+        print(f"GM threshold: {packer.gm_threshold}m")
+        print("-" * 60)
+
+    def _print_step(self, step, total, container):
+        print(f"\n[{step}/{total}] Placing {container.container_id} ({container.cargo_type}, {container.total_weight}t)...")
+
+    def on_placed(self, step, total, container, slot):
+        self._print_step(step, total, container)
+        stability = self.ship.calculate_current_stability()
+        print(f"  ✓ Placed in {slot.slot_id}")
+        print(f"    GM: {stability['gm']}m, Total weight: {stability['total_weight']}t")
+
+    def on_failed(self, step, total, container, reason):
+        self._print_step(step, total, container)
+        print(f"  ✗ {reason}")
+
+    def on_finish(self, result):
+        metrics = result['metrics']
+        print("\n" + "=" * 60)
+        print(f"Packing complete: {metrics['placed_containers']}/{metrics['total_containers']} placed")
+        print("=" * 60)
+
+
+class BatchingObserver(PackingObserver):
+    """
+    Hands packing events to a sink in small batches as the solve runs
+
+    The sink is called with one event dict at a time:
+        {'event': 'start', 'total': int, 'strategy': str}
+        {'event': 'placements', 'placed': [...], 'failed': [...]}
+        {'event': 'finish', 'metrics': dict}
+
+    A batch goes out once it holds batch_size events or max_delay seconds
+    have passed since the last one, whichever comes first.
+    """
+
+    def __init__(self, sink, batch_size=20, max_delay=0.05, describe=None):
+        """
+        Args:
+            sink: Callable receiving each event dict
+            batch_size: Max placement events per batch
+            max_delay: Max seconds a pending event waits before it is sent
+            describe: Optional callable(container, slot) -> dict of extra
+                      fields merged into each placement entry
+        """
+        self.sink = sink
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.describe = describe
+        self._placed = []
+        self._failed = []
+        self._last_flush = 0.0
+
+    def on_start(self, packer, containers, strategy):
+        self.ship = packer.ship
+        self._last_flush = time.monotonic()
+        self.sink({'event': 'start', 'total': len(containers), 'strategy': strategy})
+
+    def on_placed(self, step, total, container, slot):
+        entry = {
+            'step': step,
+            'id': container.container_id,
+            'slot': slot.slot_id,
+            'bay': slot.bay,
+            'row': slot.row,
+            'tier': slot.tier,
+            'gm': self.ship.current_gm,
+            'weight': round(self.ship.displacement, 2),
+        }
+        if self.describe:
+            entry.update(self.describe(container, slot))
+        self._placed.append(entry)
+        self._maybe_flush()
+
+    def on_failed(self, step, total, container, reason):
+        self._failed.append({'step': step, 'id': container.container_id, 'reason': reason})
+        self._maybe_flush()
+
+    def on_finish(self, result):
+        self.flush()
+        self.sink({'event': 'finish', 'metrics': result['metrics']})
+
+    def _maybe_flush(self):
+        if (len(self._placed) + len(self._failed) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.max_delay):
+            self.flush()
+
+    def flush(self):
+        """Send pending placement events now"""
+        self._last_flush = time.monotonic()
+        if not self._placed and not self._failed:
+            return
+        self.sink({'event': 'placements', 'placed': self._placed, 'failed': self._failed})
+        self._placed = []
+        self._failed = []
@@ -0,0 +1,96 @@
+"""
+Dynamic container ordering - place the most constrained class first
+"""
+from collections import deque
+
+
+class ConstrainedOrdering:
+    """
+    Picks the next container from the class with the fewest feasible slots
+
+    Containers are grouped by class (cargo type x weight band). For each
+    class and stack, it records whether the stack's next free slot passes
+    the constraint checks for the class's heaviest container. A class's
+    count is the number of stacks it can still use.
+
+    After a placement only the stack that changed is re-checked (plus,
+    for a hazmat, the stacks inside its exclusion zone for hazmat
+    classes), so each step costs O(classes x affected stacks) however
+    many containers remain. Stability is left to the packer's own slot
+    search, since GM shifts with every placement.
+    """
+
+    def __init__(self, packer, containers, band_size=5.0):
+        """
+        Args:
+            packer: MaritimePacker whose ship and checker define feasibility
+            containers: Containers to order
+            band_size: Width of the weight bands in tonnes
+        """
+        self.ship = packer.ship
+        self.checker = packer.checker
+
+        groups = {}
+        for container in sorted(containers, key=lambda c: c.total_weight, reverse=True):
+            key = (container.cargo_type, int(container.total_weight // band_size))
+            groups.setdefault(key, []).append(container)
+
+        self.classes = list(groups)
+        self.remaining = {key: deque(members) for key, members in groups.items()}
+        # Heaviest member stands in for the whole class
+        self.representative = {key: members[0] for key, members in groups.items()}
+
+        stacks = self.ship.stacks
+        self.feasible = {key: [self._check(key, stack) for stack in stacks] for key in self.classes}
+        self.counts = {key: sum(flags) for key, flags in self.feasible.items()}
+        self.hazmat_classes = [key for key in self.classes if self.representative[key].is_hazmat()]
+        self._neighbours = self._stack_neighbours(self.checker.hazmat_separation)
+
+    def _stack_neighbours(self, separation):
+        """Stacks whose bay/row lie closer than separation to each stack"""
+        neighbours = []
+        for stack in self.ship.stacks:
+            neighbours.append([
+                other for other in self.ship.stacks
+                if abs(other.bay - stack.bay) + abs(other.row - stack.row) < separation
+            ])
+        return neighbours
+
+    def _check(self, key, stack):
+        slot = stack.next_slot
+        if slot is None:
+            return False
+        can_place, _ = self.checker.check_all_constraints(self.representative[key], slot, self.ship)
+        return can_place
+
+    def _recheck(self, keys, stacks):
+        for key in keys:
+            flags = self.feasible[key]
+            for stack in stacks:
+                flag = self._check(key, stack)
+                if flag != flags[stack.index]:
+                    self.counts[key] += 1 if flag else -1
+                    flags[stack.index] = flag
+
+    def __len__(self):
+        return sum(len(members) for members in self.remaining.values())
+
+    def pop(self):
+        """
+        Next container: heaviest of the class with the fewest feasible
+        stacks (heavier class first on ties)
+
+        Classes with no feasible stack wait until every other class is
+        done, since stacks rising out of a hazmat zone can open up again.
+        """
+        pending = [key for key in self.classes if self.remaining[key]]
+        open_classes = [key for key in pending if self.counts[key]] or pending
+        key = min(open_classes, key=lambda key: (self.counts[key], -self.representative[key].total_weight))
+        return self.remaining[key].popleft()
+
+    def placed(self, slot):
+        """Update class counts after a container went into slot"""
+        stack = slot.stack
+        self._recheck(self.classes, [stack])
+        if slot.container.is_hazmat() and self.hazmat_classes:
+            self._recheck(self.hazmat_classes, self._neighbours[stack.index])
@@ -1,7 +1,52 @@
 """
 Maritime-aware packing algorithm with constraint validation
 """
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import random
+import time
+
 from py3dbc.maritime.constraints import MaritimeConstraintChecker
+from py3dbc.maritime.vectorized import VectorizedSlotEngine
+from py3dbc.maritime.observers import PackingObserver
+from py3dbc.maritime.improver import PlanImprover
+from py3dbc.maritime.beam import BeamSearch
+from py3dbc.maritime.ordering import ConstrainedOrdering
+from py3dbc.maritime.profiling import PackingProfile
+from py3dbc.maritime.diagnostics import FailureDiagnostics
+from py3dbc.maritime.rotation import PortRotation
+
+
+STRATEGIES = ('heavy_first', 'priority', 'hazmat_first', 'most_constrained')
+
+
+def placement_then_gm(metrics):
+    """Default portfolio objective: placement rate first, then GM margin"""
+    return (metrics['placement_rate'], metrics['stability_margin'])
+
+
+def _solve_portfolio_member(ship, containers, strategy, seed, settings):
+    """
+    Pack one portfolio member on its own ship copy
+    
+    Returns the attempt order as (container index, slot index or None)
+    pairs so the winning plan can be replayed on the caller's objects.
+    """
+    packer = MaritimePacker(ship, log_placements=False, **settings)
+    result = packer.pack(containers, strategy=strategy, tie_break_seed=seed)
+    
+    position = {id(c): i for i, c in enumerate(containers)}
+    steps = [
+        (position[id(c)], c.assigned_slot.index if c.assigned_slot else None)
+        for c in packer.last_order
+    ]
+    
+    return {
+        'strategy': strategy,
+        'tie_break_seed': seed,
+        'metrics': result['metrics'],
+        'steps': steps
+    }
 
 
 class MaritimePacker:
@@ -9,31 +54,68 @@ class MaritimePacker:
     Optimized container placement with maritime constraints and stability validation
     """
     
-    def __init__(self, ship, gm_threshold=None, hazmat_separation=3):
+    ENGINES = ('scalar', 'vectorized')
+    
+    def __init__(self, ship, gm_threshold=None, hazmat_separation=3, engine='scalar',
+                 observer=None, log_placements=True, checker=None, profile=False,
+                 port_rotation=None, restow_penalty=25.0):
         """
         Args:
             ship: ContainerShip instance
             gm_threshold: Minimum GM required (uses ship's gm_min if not specified)
             hazmat_separation: Minimum distance between hazmat containers
+            engine: 'scalar' (slot-by-slot) or 'vectorized' (NumPy batch)
+            observer: PackingObserver receiving progress events (silent if None)
+            log_placements: Record every placement in placement_log
+            checker: Preconfigured MaritimeConstraintChecker (overrides hazmat_separation)
+            profile: Time the slot search phases and count rejections, reported
+                     as metrics['profile'] (see PackingProfile)
+            port_rotation: Ports in discharge order; turns on multi-port mode,
+                           scoring overstows and reporting metrics['restows']
+            restow_penalty: Score points lost per container a placement buries
+                            under a later-discharge box
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {self.ENGINES}")
+        
         self.ship = ship
         self.gm_threshold = gm_threshold or ship.gm_min
-        self.checker = MaritimeConstraintChecker(
+        self.checker = checker or MaritimeConstraintChecker(
             hazmat_separation=hazmat_separation,
             check_reefer=True,
             check_weight=True
         )
         
+        self.rotation = PortRotation(port_rotation) if port_rotation else None
+        self.restow_penalty = restow_penalty
+        
+        self.engine = engine
+        self.slot_engine = VectorizedSlotEngine(self) if engine == 'vectorized' else None
+        
+        self.observer = observer or PackingObserver()
+        self.log_placements = log_placements
+        
+        self.profile = PackingProfile() if profile else None
+        
         self.placement_log = []
         self.failed_placements = []
+        self.last_order = []
+    
+    def _reset_profile(self):
+        if self.profile is not None:
+            self.profile.reset()
     
-    def pack(self, containers, strategy='heavy_first'):
+    def pack(self, containers, strategy='heavy_first', tie_break_seed=None):
         """
         Pack containers into ship using specified strategy
         
         Args:
             containers: List of MaritimeContainer objects
-            strategy: 'heavy_first', 'priority', or 'hazmat_first'
+            strategy: 'heavy_first', 'priority', 'hazmat_first',
+                      'most_constrained' (dynamic order, see ConstrainedOrdering)
+                      or 'port_rotation' (last port first; needs port_rotation)
+            tie_break_seed: If set, containers that sort equal are shuffled
+                            with this seed instead of keeping input order
             
         Returns:
             dict: {
@@ -44,60 +126,252 @@ class MaritimePacker:
             }
         """
         # Sort containers based on strategy
-        sorted_containers = self._sort_containers(containers, strategy)
-        
+        if tie_break_seed is not None:
+            containers = list(containers)
+            random.Random(tie_break_seed).shuffle(containers)
         placed = []
         failed = []
+        self._reset_profile()
+        
+        if self.slot_engine:
+            self.slot_engine.sync()
+        
+        if strategy == 'most_constrained':
+            return self._pack_most_constrained(containers, placed, failed)
+        
+        sorted_containers = self._sort_containers(containers, strategy)
+        self.last_order = sorted_containers
         
-        print(f"\nStarting packing with strategy: {strategy}")
-        print(f"Total containers to place: {len(sorted_containers)}")
-        print(f"GM threshold: {self.gm_threshold}m")
-        print("-" * 60)
+        total = len(sorted_containers)
+        self.observer.on_start(self, sorted_containers, strategy)
         
         for i, container in enumerate(sorted_containers):
-            print(f"\n[{i+1}/{len(sorted_containers)}] Placing {container.container_id} ({container.cargo_type}, {container.total_weight}t)...")
-            
             slot = self._find_best_slot(container)
+            self._commit(i + 1, total, container, slot, placed, failed)
+        
+        return self._finish(placed, failed)
+    
+    def _pack_most_constrained(self, containers, placed, failed):
+        """
+        Pack choosing each next container dynamically
+        
+        The class (cargo type x weight band) with the fewest feasible
+        stacks goes next, so reefers, heavy boxes and hazmats are placed
+        while they still have options.
+        """
+        ordering = ConstrainedOrdering(self, containers)
+        self.last_order = []
+        
+        total = len(ordering)
+        self.observer.on_start(self, containers, 'most_constrained')
+        
+        for i in range(total):
+            container = ordering.pop()
+            self.last_order.append(container)
+            slot = self._find_best_slot(container)
+            self._commit(i + 1, total, container, slot, placed, failed)
+            if container.assigned_slot is not None:
+                ordering.placed(container.assigned_slot)
+        
+        return self._finish(placed, failed)
+    
+    def pack_portfolio(self, containers, strategies=STRATEGIES, random_variants=0,
+                       objective=placement_then_gm, max_workers=None):
+        """
+        Pack with several strategies in parallel and keep the best plan
+        
+        Every strategy (plus random_variants randomized tie-break runs,
+        cycling through the strategies) is solved on its own copy of the
+        ship in a process pool. The winning plan is then applied to this
+        packer's ship.
+        
+        Args:
+            containers: List of MaritimeContainer objects
+            strategies: Strategies to run
+            random_variants: Extra runs with seeded random tie-breaking
+            objective: Callable(metrics) -> sortable key, higher is better
+            max_workers: Process pool size (1 runs in-process)
+            
+        Returns:
+            dict: Same as pack(), plus 'strategy', 'tie_break_seed' and
+                  'portfolio' (metrics of every run)
+        """
+        members = [(strategy, None) for strategy in strategies]
+        members += [
+            (strategies[i % len(strategies)], i + 1)
+            for i in range(random_variants)
+        ]
+        settings = {
+            'gm_threshold': self.gm_threshold,
+            'engine': self.engine,
+            'checker': self.checker,
+            'profile': self.profile is not None,
+            'port_rotation': self.rotation.ports if self.rotation else None,
+            'restow_penalty': self.restow_penalty
+        }
+        
+        if max_workers == 1 or len(members) == 1:
+            runs = []
+            for strategy, seed in members:
+                # Each member gets its own checker, as pickling gives it in
+                # the pool: adaptive stage stats must not leak between runs
+                ship, member_containers, member_settings = copy.deepcopy((self.ship, containers, settings))
+                runs.append(_solve_portfolio_member(ship, member_containers, strategy, seed, member_settings))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                futures = [
+                    pool.submit(_solve_portfolio_member, self.ship, containers, strategy, seed, settings)
+                    for strategy, seed in members
+                ]
+                runs = [future.result() for future in futures]
+        
+        best = max(runs, key=lambda run: objective(run['metrics']))
+        
+        # Profile covers every member's search plus the replay
+        self._reset_profile()
+        if self.profile is not None:
+            for run in runs:
+                self.profile.merge(run['metrics']['profile'])
+        
+        result = self._apply_plan(containers, best)
+        result['strategy'] = best['strategy']
+        result['tie_break_seed'] = best['tie_break_seed']
+        result['portfolio'] = [
+            {'strategy': run['strategy'], 'tie_break_seed': run['tie_break_seed'], 'metrics': run['metrics']}
+            for run in runs
+        ]
+        return result
+    
+    def _apply_plan(self, containers, run):
+        """Replay a portfolio member's placements on this packer's ship"""
+        ordered = [containers[i] for i, _ in run['steps']]
+        self.last_order = ordered
+        
+        placed = []
+        failed = []
+        
+        total = len(ordered)
+        self.observer.on_start(self, ordered, run['strategy'])
+        
+        for step, (container_index, slot_index) in enumerate(run['steps']):
+            slot = self.ship.slots[slot_index] if slot_index is not None else None
+            self._commit(step + 1, total, containers[container_index], slot, placed, failed)
+        
+        if self.slot_engine:
+            self.slot_engine.sync()
+        
+        return self._finish(placed, failed)
+    
+    def pack_beam(self, containers, strategy='heavy_first', beam_width=4, branching=3):
+        """
+        Pack with beam search instead of a single greedy pass
+        
+        Containers are taken in the strategy's order; the beam keeps the
+        beam_width best partial plans, each branching on its top
+        `branching` slots per container. beam_width=1, branching=1 is
+        the greedy plan.
+        
+        Returns:
+            dict: Same as pack(), plus 'beam' with search statistics
+        """
+        self._reset_profile()
+        ordered = self._sort_containers(containers, strategy)
+        search = BeamSearch(self, beam_width=beam_width, branching=branching)
+        best = search.search(ordered)
+        plan = {id(node.container): node.slot for node in best.path()}
+        
+        # Replay the winning plan so the observer and placement log see it
+        search.checkout(search.root)
+        if self.slot_engine:
+            self.slot_engine.sync()
+        self.last_order = ordered
+        placed = []
+        failed = []
+        total = len(ordered)
+        self.observer.on_start(self, ordered, strategy)
+        for i, container in enumerate(ordered):
+            self._commit(i + 1, total, container, plan[id(container)], placed, failed)
+        
+        result = self._finish(placed, failed)
+        result['beam'] = dict(search.stats, beam_width=beam_width, branching=branching)
+        return result
+    
+    def improve(self, result, time_budget=1.0, max_iterations=None, seed=0):
+        """
+        Improve a finished pack() result with local search
+        
+        Runs PlanImprover on this packer's ship (which must still hold
+        the plan) and returns its result, including an 'improvement'
+        report of placement rate and GM margin before and after. With
+        profiling on, the profile adds the search's time to the pack's.
+        """
+        improver = PlanImprover(self, time_budget=time_budget, max_iterations=max_iterations, seed=seed)
+        return improver.improve(result)
+    
+    def diagnose_failures(self, failed):
+        """
+        Explain why containers found no slot
+        
+        Computed on demand against the ship's current state, so packing
+        itself never pays for it (see FailureDiagnostics).
+        
+        Args:
+            failed: Containers to diagnose, usually result['failed']
             
-            if slot:
-                # Place container
-                success = self.ship.place_container_in_slot(container, slot)
-                if success:
-                    placed.append(container)
+        Returns:
+            dict: container ID -> diagnosis (binding constraint histogram
+                  over all slots and the closest near-miss slot)
+        """
+        return FailureDiagnostics(self).diagnose_all(failed)
+    
+    def _commit(self, step, total, container, slot, placed, failed):
+        """Place container in the chosen slot (or record failure) and notify"""
+        start = time.perf_counter() if self.profile is not None else 0.0
+        if slot:
+            # Place container
+            success = self.ship.place_container_in_slot(container, slot)
+            if success:
+                placed.append(container)
+                if self.slot_engine:
+                    self.slot_engine.update_slot(slot)
+                
+                if self.log_placements:
                     stability = self.ship.calculate_current_stability()
-                    print(f"  ✓ Placed in {slot.slot_id}")
-                    print(f"    GM: {stability['gm']}m, Total weight: {stability['total_weight']}t")
-                    
                     self.placement_log.append({
                         'container': container.container_id,
                         'slot': slot.slot_id,
                         'gm': stability['gm'],
                         'weight': stability['total_weight']
                     })
-                else:
-                    failed.append(container)
-                    print(f"  ✗ Failed to place (unknown error)")
+                self.observer.on_placed(step, total, container, slot)
             else:
                 failed.append(container)
-                print(f"  ✗ No valid slot found")
-                self.failed_placements.append({
-                    'container': container.container_id,
-                    'reason': 'No valid slot available'
-                })
-        
-        print("\n" + "=" * 60)
-        print(f"Packing complete: {len(placed)}/{len(sorted_containers)} placed")
-        print("=" * 60)
+                self.observer.on_failed(step, total, container, 'Failed to place (unknown error)')
+        else:
+            failed.append(container)
+            self.failed_placements.append({
+                'container': container.container_id,
+                'reason': 'No valid slot available'
+            })
+            self.observer.on_failed(step, total, container, 'No valid slot available')
         
+        if self.profile is not None:
+            self.profile.add('commit', time.perf_counter() - start)
+    
+    def _finish(self, placed, failed):
+        """Build the pack() result and notify the observer"""
         metrics = self._calculate_metrics(placed, failed)
         
-        return {
+        result = {
             'success': len(failed) == 0,
             'placed': placed,
             'failed': failed,
             'metrics': metrics,
             'placement_log': self.placement_log
         }
+        self.observer.on_finish(result)
+        
+        return result
     
     def _sort_containers(self, containers, strategy):
         """Sort containers based on placement strategy"""
@@ -116,6 +390,15 @@ class MaritimePacker:
                 -c.total_weight
             ))
         
+        elif strategy == 'port_rotation':
+            # Last port loads first, so earlier discharges end up on top
+            if not self.rotation:
+                raise ValueError("Strategy 'port_rotation' needs a port_rotation")
+            return sorted(containers, key=lambda c: (
+                -self.rotation.discharge_index(c),
+                -c.total_weight
+            ))
+        
         else:
             return containers
     
@@ -129,17 +412,28 @@ class MaritimePacker:
         3. Prefers lower tiers for heavy containers
         4. Balanced transverse position (minimize list/heel)
         """
-        available_slots = self.ship.get_available_slots()
+        if self.slot_engine:
+            return self.slot_engine.find_best_slot(container)
+        
+        ranked = self._rank_slots(container)
+        return ranked[0][0] if ranked else None
+    
+    def _rank_slots(self, container, limit=None):
+        """
+        Valid slots for container as (slot, score) pairs, best first
+        
+        The first entry is the slot _find_best_slot picks.
+        """
+        if self.slot_engine:
+            return self.slot_engine.rank_slots(container, limit)
+        
+        if self.profile is not None:
+            return self._rank_slots_profiled(container, limit)
         
         valid_slots = []
         
-        for slot in available_slots:
-            # Check constraints
-            can_place, reason = self.checker.check_all_constraints(container, slot, self.ship)
-            
-            if not can_place:
-                continue
-            
+        # Check constraints, cheapest and most selective first
+        for slot in self.checker.filter_slots(container, self._candidate_slots(container), self.ship):
             # Check stability after placement
             is_stable, predicted_gm = self.checker.validate_stability_after_placement(
                 container, slot, self.ship, self.gm_threshold
@@ -151,16 +445,98 @@ class MaritimePacker:
             # Calculate slot score
             score = self._calculate_slot_score(container, slot, predicted_gm)
             
-            valid_slots.append((slot, score, predicted_gm))
+            valid_slots.append((slot, score))
         
-        if not valid_slots:
-            return None
+        # Best score first (stable, so equal scores keep slot order)
+        valid_slots.sort(key=lambda x: x[1], reverse=True)
+        
+        return valid_slots[:limit]
+    
+    def _candidate_slots(self, container, profile=None):
+        """
+        Slots worth a full check, narrowed with the ship's free-slot index
+        
+        If profile is given, every slot returned by the free-slot index
+        counts as examined, and those the reefer and hazmat filters drop
+        count as rejections.
+        """
+        if self.checker.require_support:
+            # Only the next free tier of each stack can take a container
+            available_slots = self.ship.get_stack_top_slots()
+            if profile is not None:
+                profile.slots_examined += len(available_slots)
+            if container.is_reefer() and self.checker.check_reefer:
+                open_slots = len(available_slots)
+                available_slots = [slot for slot in available_slots if slot.is_reefer_slot]
+                if profile is not None:
+                    profile.reject('reefer', open_slots - len(available_slots))
+        else:
+            if container.is_reefer() and self.checker.check_reefer:
+                available_slots = self.ship.get_free_reefer_slots()
+            else:
+                available_slots = self.ship.get_available_slots()
+            if profile is not None:
+                profile.slots_examined += len(available_slots)
+        
+        # Drop slots inside another hazmat's exclusion zone up front
+        if container.is_hazmat():
+            separation = self.checker.hazmat_separation
+            open_slots = len(available_slots)
+            available_slots = [
+                slot for slot in available_slots
+                if not self.ship.is_hazmat_blocked(slot, separation)
+            ]
+            if profile is not None:
+                profile.reject('hazmat', open_slots - len(available_slots))
         
-        # Select slot with best score
+        return available_slots
+    
+    def _rank_slots_profiled(self, container, limit=None):
+        """_rank_slots with every phase timed and every rejection counted"""
+        profile = self.profile
+        clock = time.perf_counter
+        
+        start = clock()
+        available_slots = self._candidate_slots(container, profile)
+        profile.add('candidates', clock() - start)
+        
+        valid_slots = []
+        constraint_time = stability_time = scoring_time = 0.0
+        stability_calls = 0
+        
+        for slot in available_slots:
+            start = clock()
+            constraint, _ = self.checker.find_violation(container, slot, self.ship)
+            checked = clock()
+            constraint_time += checked - start
+            if constraint is not None:
+                profile.reject(constraint)
+                continue
+            
+            is_stable, predicted_gm = self.checker.validate_stability_after_placement(
+                container, slot, self.ship, self.gm_threshold
+            )
+            validated = clock()
+            stability_time += validated - checked
+            stability_calls += 1
+            if not is_stable:
+                profile.reject('stability')
+                continue
+            
+            score = self._calculate_slot_score(container, slot, predicted_gm)
+            scoring_time += clock() - validated
+            valid_slots.append((slot, score))
+        
+        start = clock()
         valid_slots.sort(key=lambda x: x[1], reverse=True)
-        best_slot = valid_slots[0][0]
+        profile.add('sort', clock() - start)
         
-        return best_slot
+        profile.add('constraints', constraint_time, len(available_slots))
+        profile.add('stability', stability_time, stability_calls)
+        profile.add('scoring', scoring_time, len(valid_slots))
+        profile.searches += 1
+        
+        return valid_slots[:limit]
     
     def _calculate_slot_score(self, container, slot, predicted_gm):
         """
@@ -186,6 +562,10 @@ class MaritimePacker:
         # Prefer forward bays (easier discharge)
         score += slot.bay * 2
         
+        # Avoid burying boxes that discharge earlier (each one is a restow)
+        if self.rotation:
+            score -= self.restow_penalty * self.rotation.overstows(container, slot.stack)
+        
         return score
     
     def _calculate_metrics(self, placed, failed):
@@ -202,7 +582,7 @@ class MaritimePacker:
         for c in placed:
             cargo_types[c.cargo_type] = cargo_types.get(c.cargo_type, 0) + 1
         
-        return {
+        metrics = {
             'total_containers': total_containers,
             'placed_containers': len(placed),
             'failed_containers': len(failed),
@@ -217,6 +597,36 @@ class MaritimePacker:
             'stability_margin': round(stability['gm'] - self.gm_threshold, 3),
             'cargo_distribution': cargo_types
         }
+        if self.rotation:
+            metrics['restows'] = self.rotation.evaluate(self.ship)
+        if self.profile is not None:
+            metrics['profile'] = self.profile.to_dict()
+            metrics['profile']['pipeline'] = self.checker.pipeline_stats()
+        
+        return metrics
+    
+    def replay_log(self, placed):
+        """
+        placement_log entries for a finished plan, as if loaded bottom tier first
+        
+        For plans whose order of placement is lost (improved plans) or
+        was never logged; GM and weight are the running values in that order.
+        """
+        ship = self.ship
+        moment = ship.kg_lightship * ship.lightship_weight
+        displacement = ship.lightship_weight
+        log = []
+        for container in sorted(placed, key=lambda c: (c.assigned_slot.tier, c.assigned_slot.index)):
+            slot = container.assigned_slot
+            moment += container.total_weight * slot.z_pos
+            displacement += container.total_weight
+            log.append({
+                'container': container.container_id,
+                'slot': slot.slot_id,
+                'gm': round(ship.kb + ship.bm - moment / displacement, 3),
+                'weight': round(displacement, 2)
+            })
+        return log
     
     def get_placement_summary(self):
         """Get detailed placement summary"""
@@ -0,0 +1,107 @@
+"""
+Pre-flight feasibility bounds - quick limits on what any plan can achieve
+"""
+import numpy as np
+
+
+def feasibility_bounds(ship, weight, cargo_type, teu, gm_threshold=None):
+    """
+    Upper bounds for packing a manifest onto an empty ship
+
+    Works on manifest columns and the ship's slot arrays only, so it
+    costs milliseconds. Every bound relaxes the packer's constraints,
+    so no plan can beat it.
+
+    Args:
+        ship: ContainerShip (its slot layout and stability parameters)
+        weight: Array of container weights (t)
+        cargo_type: Array of cargo type names
+        teu: Array of TEU values (1 or 2)
+        gm_threshold: Minimum GM (ship's gm_min if None)
+
+    Returns:
+        dict: counts and bounds, with 'feasible' True only if the whole
+              manifest could possibly be placed
+    """
+    threshold = ship.gm_min if gm_threshold is None else gm_threshold
+    weight = np.asarray(weight, dtype=np.float64)
+    cargo_type = np.asarray(cargo_type)
+    teu = np.asarray(teu, dtype=np.int64)
+
+    table = ship.table
+    z_pos = np.frombuffer(table.z_pos, dtype=np.float64)
+    max_tier_weight = np.frombuffer(table.max_tier_weight, dtype=np.float64)
+    is_reefer_slot = np.frombuffer(table.is_reefer_slot, dtype=bool)
+    slot_count = len(z_pos)
+    reefer_slot_count = int(is_reefer_slot.sum())
+
+    # Boxes heavier than any slot they could use can never be placed
+    is_reefer = cargo_type == 'reefer'
+    heaviest_slot = max_tier_weight.max() if slot_count else 0.0
+    heaviest_reefer_slot = max_tier_weight[is_reefer_slot].max() if reefer_slot_count else 0.0
+    fits_weight = np.where(is_reefer, weight <= heaviest_reefer_slot, weight <= heaviest_slot)
+
+    reefer_fit = int((is_reefer & fits_weight).sum())
+    other_fit = int((~is_reefer & fits_weight).sum())
+    reefer_placeable = min(reefer_fit, reefer_slot_count)
+    placeable = min(slot_count, other_fit + reefer_placeable)
+
+    # TEU: all fitting non-reefers plus the largest fitting reefers that have slots,
+    # then only the placeable largest of those
+    reefer_teu = np.sort(teu[is_reefer & fits_weight])[::-1][:reefer_placeable]
+    candidate_teu = np.concatenate([teu[~is_reefer & fits_weight], reefer_teu])
+    teu_bound = int(np.sort(candidate_teu)[::-1][:placeable].sum())
+
+    # Best-case GM with the full manifest: heaviest boxes in the lowest slots
+    # (rearrangement inequality gives the least vertical moment)
+    full_load = len(weight) <= slot_count
+    if full_load:
+        lowest = np.sort(z_pos)[:len(weight)]
+        moment = ship.kg_lightship * ship.lightship_weight + np.dot(np.sort(weight)[::-1], lowest)
+        displacement = ship.lightship_weight + weight.sum()
+        gm_best_case = round(float(ship.kb + ship.bm - moment / displacement), 3)
+    else:
+        gm_best_case = None
+
+    total_weight = round(float(weight.sum()), 2)
+
+    return {
+        'containers': int(len(weight)),
+        'slots': slot_count,
+        'reefers': int(is_reefer.sum()),
+        'reefer_slots': reefer_slot_count,
+        'too_heavy': int((~fits_weight).sum()),
+        'placeable': int(placeable),
+        'reefer_placeable': int(reefer_placeable),
+        'placement_rate_bound': round(placeable / len(weight) * 100, 2) if len(weight) else 0,
+        'teu': int(teu.sum()),
+        'teu_bound': teu_bound,
+        'total_weight': total_weight,
+        'deadweight': ship.max_weight,
+        # Reported, not folded into 'placeable': the packer does not enforce deadweight
+        'within_deadweight': total_weight <= ship.max_weight,
+        'gm_best_case': gm_best_case,
+        'gm_feasible': gm_best_case is not None and gm_best_case >= threshold,
+        'feasible': placeable == len(weight) and full_load and gm_best_case >= threshold
+                    and total_weight <= ship.max_weight,
+    }
+
+
+def container_bounds(ship, containers, gm_threshold=None):
+    """feasibility_bounds for a list of MaritimeContainers"""
+    return feasibility_bounds(
+        ship,
+        [c.total_weight for c in containers],
+        [c.cargo_type for c in containers],
+        [c.teu_value for c in containers],
+        gm_threshold
+    )
+
+
+def optimality_gap(bounds, metrics):
+    """How far a packing result is from the pre-flight bounds"""
+    return {
+        'placed_gap': bounds['placeable'] - metrics['placed_containers'],
+        'placement_rate_gap': round(bounds['placement_rate_bound'] - metrics['placement_rate'], 2),
+        'teu_gap': bounds['teu_bound'] - metrics['total_teu'],
+    }
@@ -0,0 +1,64 @@
+"""
+Packing profile - per-phase timing and counters for the slot search
+"""
+
+
+class PackingProfile:
+    """
+    Wall time per phase of the slot search and why slots were rejected
+
+    Phases:
+    - candidates: building the candidate slot list for a container
+    - constraints: check_all_constraints on each candidate
+    - stability: validate_stability_after_placement
+    - scoring: _calculate_slot_score
+    - sort: ranking the valid slots
+    - commit: placing the chosen container and notifying the observer
+
+    Rejections are counted per constraint (occupied, support, weight,
+    reefer, hazmat, stability, plus any registered on the checker).
+    Slots dropped by the candidate filters before the full check count
+    against the constraint that dropped them.
+    """
+
+    PHASES = ('candidates', 'constraints', 'stability', 'scoring', 'sort', 'commit')
+    REJECTIONS = ('occupied', 'support', 'weight', 'reefer', 'hazmat', 'stability')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Clear all timings and counters"""
+        self.seconds = dict.fromkeys(self.PHASES, 0.0)
+        self.calls = dict.fromkeys(self.PHASES, 0)
+        self.rejections = dict.fromkeys(self.REJECTIONS, 0)
+        self.searches = 0
+        self.slots_examined = 0
+
+    def add(self, phase, seconds, calls=1):
+        self.seconds[phase] += seconds
+        self.calls[phase] += calls
+
+    def reject(self, constraint, count=1):
+        self.rejections[constraint] = self.rejections.get(constraint, 0) + count
+
+    def merge(self, profile):
+        """Add the totals of another profile (a to_dict() result)"""
+        for phase, entry in profile['phases'].items():
+            self.add(phase, entry['seconds'], entry['calls'])
+        for constraint, count in profile['rejections'].items():
+            self.reject(constraint, count)
+        self.searches += profile['searches']
+        self.slots_examined += profile['slots_examined']
+
+    def to_dict(self):
+        return {
+            'phases': {
+                phase: {'seconds': round(self.seconds[phase], 6), 'calls': self.calls[phase]}
+                for phase in self.PHASES
+            },
+            'total_seconds': round(sum(self.seconds.values()), 6),
+            'searches': self.searches,
+            'slots_examined': self.slots_examined,
+            'rejections': dict(self.rejections),
+        }
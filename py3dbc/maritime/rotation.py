@@ -0,0 +1,105 @@
+"""
+Port rotation - discharge order, overstows and restow counts
+"""
+import numpy as np
+
+
+class PortRotation:
+    """
+    Discharge order of a multi-port voyage
+
+    A container overstows another when it sits above it in the same
+    stack and discharges later: at the lower box's port it has to be
+    lifted off and reloaded (a restow). Containers whose destination is
+    not in the rotation stay aboard past its last port.
+    """
+
+    def __init__(self, ports):
+        """
+        Args:
+            ports: Port names in discharge order
+        """
+        ports = tuple(ports)
+        if len(set(ports)) != len(ports):
+            raise ValueError("Port rotation lists a port twice")
+
+        self.ports = ports
+        self._index = {port: i for i, port in enumerate(ports)}
+
+    def __len__(self):
+        return len(self.ports)
+
+    def discharge_index(self, container):
+        """Position of container's port in the rotation (len(ports) if not in it)"""
+        return self._index.get(container.destination, len(self.ports))
+
+    def overstows(self, container, stack):
+        """Containers in stack that discharge before container, so placing it on top buries them"""
+        port = self.discharge_index(container)
+        count = 0
+        for slot in stack.slots[:stack.height]:
+            below = slot.container
+            if below is not None and self._index.get(below.destination, len(self.ports)) < port:
+                count += 1
+        return count
+
+    def stack_ports(self, stack):
+        """Containers per discharge index in stack (length len(ports) + 1)"""
+        counts = [0] * (len(self.ports) + 1)
+        for slot in stack.slots[:stack.height]:
+            if slot.container is not None:
+                counts[self.discharge_index(slot.container)] += 1
+        return counts
+
+    def discharge_matrix(self, ship):
+        """Discharge index per stack (rows) and tier (columns), -1 where empty"""
+        matrix = np.full((len(ship.stacks), ship.tiers), -1, dtype=np.int64)
+        for container in ship.placed_containers:
+            slot = container.assigned_slot
+            matrix[slot.stack.index, slot.tier - 1] = self.discharge_index(container)
+        return matrix
+
+    def evaluate(self, ship):
+        """
+        Restow moves the plan on ship needs, port by port
+
+        At each port every box above the lowest one discharging there is
+        lifted; those not discharging are restows and go back aboard in
+        the same order. Works on a stacks x tiers matrix, so a whole plan
+        costs a few array passes per port.
+
+        Returns:
+            dict: {
+                'ports': per port discharged boxes, restows and stacks touched,
+                'total_restows': sum over the rotation,
+                'overstowed_containers': boxes with a later discharge above them
+            }
+        """
+        matrix = self.discharge_matrix(ship)
+        tiers = np.arange(matrix.shape[1])
+
+        # A box is overstowed if anything above it discharges later
+        above_max = np.maximum.accumulate(matrix[:, ::-1], axis=1)[:, ::-1]
+        above_max = np.concatenate([above_max[:, 1:], np.full((len(matrix), 1), -1)], axis=1)
+        overstowed = int(((matrix >= 0) & (above_max > matrix)).sum())
+
+        remaining = matrix.copy()
+        ports = []
+        for k, port in enumerate(self.ports):
+            discharging = remaining == k
+            has_port = discharging.any(axis=1)
+            lowest = np.where(has_port, discharging.argmax(axis=1), len(tiers))
+            blocking = (tiers[None, :] > lowest[:, None]) & (remaining > k)
+            ports.append({
+                'port': port,
+                'discharged': int(discharging.sum()),
+                'restows': int(blocking.sum()),
+                'stacks_restowed': int(blocking.any(axis=1).sum()),
+            })
+            remaining[discharging] = -1
+
+        return {
+            'ports': ports,
+            'total_restows': sum(entry['restows'] for entry in ports),
+            'overstowed_containers': overstowed,
+        }
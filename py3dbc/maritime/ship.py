@@ -1,27 +1,121 @@
 """
 ContainerShip class - extends Bin with maritime structure
 """
-from py3dbp.main import Bin
+from py3dbp.main import Bin, START_POSITION
+from py3dbc.maritime.slot_table import SlotTable
+from array import array
+import copy
 import math
 
+# Undo log entry kinds
+UNDO_PLACE = 'place'
+UNDO_REMOVE = 'remove'
+
+
+def _limit(value):
+    """Weight limit as given: the table stores floats, limits are usually whole tonnes"""
+    return int(value) if value.is_integer() else value
+
 
 class Slot:
-    """Represents a single container slot on the ship"""
-    def __init__(self, slot_id, bay, row, tier, x_pos, y_pos, z_pos, 
-                 max_stack_weight, max_tier_weight, is_reefer_slot=False):
-        self.slot_id = slot_id
-        self.bay = bay
-        self.row = row
-        self.tier = tier
-        self.x_pos = x_pos
-        self.y_pos = y_pos
-        self.z_pos = z_pos
-        self.max_stack_weight = max_stack_weight
-        self.max_tier_weight = max_tier_weight
-        self.is_reefer_slot = is_reefer_slot
-        self.occupied = False
-        self.container = None
-        self.current_stack_weight = 0
+    """
+    Represents a single container slot on the ship
+    
+    A thin view over one row of the ship's SlotTable. Use from_values()
+    for a standalone slot outside a ship.
+    """
+    __slots__ = ('table', 'index', 'stack')
+    
+    def __init__(self, table, index):
+        """
+        Args:
+            table: SlotTable holding the slot data
+            index: Dense slot index into the table
+        """
+        self.table = table
+        self.index = index
+        self.stack = None  # Set by ContainerShip
+    
+    @classmethod
+    def from_values(cls, slot_id, bay, row, tier, x_pos, y_pos, z_pos,
+                    max_stack_weight, max_tier_weight, is_reefer_slot=False):
+        """Standalone slot backed by its own one-row table (the old Slot(...) signature)"""
+        table = SlotTable(bay, row, tier)
+        index = table.add(bay, row, tier, x_pos, y_pos, z_pos,
+                          max_stack_weight, max_tier_weight, is_reefer_slot)
+        if slot_id != table.slot_id(index):
+            table.labels = {index: slot_id}
+        return cls(table, index)
+    
+    # Geometry and limits (read-only)
+    @property
+    def bay(self):
+        return self.table.bay[self.index]
+    
+    @property
+    def row(self):
+        return self.table.row[self.index]
+    
+    @property
+    def tier(self):
+        return self.table.tier[self.index]
+    
+    @property
+    def x_pos(self):
+        return self.table.x_pos[self.index]
+    
+    @property
+    def y_pos(self):
+        return self.table.y_pos[self.index]
+    
+    @property
+    def z_pos(self):
+        return self.table.z_pos[self.index]
+    
+    @property
+    def max_stack_weight(self):
+        """Max weight this slot can carry (itself + everything above)"""
+        return _limit(self.table.max_stack_weight[self.index])
+    
+    @property
+    def max_tier_weight(self):
+        """Max weight of a single container in this slot"""
+        return _limit(self.table.max_tier_weight[self.index])
+    
+    @property
+    def is_reefer_slot(self):
+        return bool(self.table.is_reefer_slot[self.index])
+    
+    # Loading state
+    @property
+    def occupied(self):
+        return bool(self.table.occupied[self.index])
+    
+    @occupied.setter
+    def occupied(self, value):
+        self.table.occupied[self.index] = 1 if value else 0
+    
+    @property
+    def container(self):
+        return self.table.containers[self.index]
+    
+    @container.setter
+    def container(self, value):
+        self.table.containers[self.index] = value
+    
+    @property
+    def current_stack_weight(self):
+        """This container plus everything above"""
+        return self.table.current_stack_weight[self.index]
+    
+    @current_stack_weight.setter
+    def current_stack_weight(self, value):
+        self.table.current_stack_weight[self.index] = value
+    
+    @property
+    def slot_id(self):
+        """B##R##T## identifier"""
+        return self.table.slot_id(self.index)
     
     def can_place(self, container):
         """Check if container can be placed in this slot"""
@@ -43,6 +137,67 @@ class Slot:
         return f"Slot({self.slot_id}, occupied={self.occupied})"
 
 
+class Stack:
+    """
+    A bay/row column of slots, filled from the bottom tier up
+    
+    Tracks the next free tier, cumulative weight and top container so
+    candidate generation only needs one slot per column.
+    """
+    def __init__(self, bay, row, slots, index=None):
+        self.index = index
+        self.bay = bay
+        self.row = row
+        self.slots = slots  # Bottom tier first
+        self.height = 0  # Highest occupied tier (0 = empty)
+        self.weight = 0
+        self.top_container = None
+        self.headroom = math.inf  # Extra weight every occupied slot can still carry
+    
+    @property
+    def next_free_tier(self):
+        """Tier the next container would go in (None if full)"""
+        if self.height >= len(self.slots):
+            return None
+        return self.height + 1
+    
+    @property
+    def next_slot(self):
+        """Slot on top of the stack (None if full)"""
+        if self.height >= len(self.slots):
+            return None
+        return self.slots[self.height]
+    
+    def can_support(self, weight):
+        """Check if every occupied slot can carry another weight tonnes"""
+        return weight <= self.headroom
+    
+    def refresh(self):
+        """Recompute height, weights and headroom from the slots"""
+        self.height = 0
+        self.top_container = None
+        self.headroom = math.inf
+        
+        # Each slot carries its own container plus everything above it
+        table = self.slots[0].table
+        load = 0
+        for slot in reversed(self.slots):
+            index = slot.index
+            container = table.containers[index]
+            if container is not None:
+                load += container.total_weight
+                self.headroom = min(self.headroom, table.max_stack_weight[index] - load)
+                if self.top_container is None:
+                    self.height = table.tier[index]
+                    self.top_container = container
+            table.current_stack_weight[index] = load
+        
+        self.weight = load
+    
+    def __repr__(self):
+        return f"Stack(B{self.bay:02d}R{self.row:02d}, height={self.height}, weight={self.weight}t)"
+
+
 class ContainerShip(Bin):
     """
     Container ship with bay/row/tier structure
@@ -89,16 +244,85 @@ class ContainerShip(Bin):
         
         # Generate slot grid
         self.slots = self._generate_slots()
-        self.slot_dict = {slot.slot_id: slot for slot in self.slots}
+        self._slot_dict = None
+        self.stacks = self._generate_stacks()
         
-        # Tracking
+        # Static lookups for the free-slot index and hazmat zones
+        self._hazmat_offsets = {}
+        self._reefer_indices = [slot.index for slot in self.slots if slot.is_reefer_slot]
+        self._tier_indices = {tier: [] for tier in range(1, self.tiers + 1)}
+        for slot in self.slots:
+            self._tier_indices[slot.tier].append(slot.index)
+        
+        self._reset_tracking()
+    
+    def _reset_tracking(self):
+        """Initialise loading state for an empty ship"""
+        # Tracking (order is not meaningful: removal swaps the last box in)
         self.placed_containers = []
+        self._placed_position = {}  # container -> index in placed_containers
         self.current_kg = self.kg_lightship
         self.current_gm = self.kb + self.bm - self.kg_lightship
+        
+        # Running stability totals (updated on place/remove)
+        self.vertical_moment = self.kg_lightship * self.lightship_weight
+        self.displacement = self.lightship_weight
+        
+        # Hazmat exclusion counts per separation distance (built on demand)
+        self._hazmat_exclusion = {}
+        
+        # Undo entries since the outermost savepoint (None when not recording)
+        self._undo_log = None
+        
+        # Free-slot index: SlotTable occupancy flags plus per-group counters
+        self.free_count = len(self.slots)
+        self._free_reefer_count = len(self._reefer_indices)
+        self._free_per_tier = {tier: len(indices) for tier, indices in self._tier_indices.items()}
+        self._free_per_column = {
+            (bay, row): self.tiers
+            for bay in range(1, self.bays + 1)
+            for row in range(1, self.rows + 1)
+        }
+    
+    def reset(self):
+        """
+        Unload everything in O(slots), keeping the generated geometry
+        
+        Placed containers keep their own assigned_slot fields; only the
+        ship's side is cleared.
+        """
+        self.table.reset()
+        for stack in self.stacks:
+            stack.refresh()
+        self._reset_tracking()
+    
+    def fresh_copy(self):
+        """
+        Empty ship with the same geometry
+        
+        Shares the static slot arrays with this ship and gets its own
+        loading state, so it is much cheaper than building a new ship.
+        Loaded containers are not copied.
+        """
+        ship = copy.copy(self)
+        
+        # Mutable py3dbp Bin state
+        ship.items = []
+        ship.unfitted_items = []
+        ship.gravity = []
+        ship.fit_items = self.fit_items.copy()
+        
+        ship.table = self.table.empty_copy()
+        ship.slots = [Slot(ship.table, index) for index in range(len(self.slots))]
+        ship._slot_dict = None
+        ship.stacks = ship._generate_stacks()
+        ship._reset_tracking()
+        
+        return ship
     
     def _generate_slots(self):
         """Generate all container slots with coordinates"""
-        slots = []
+        self.table = SlotTable(self.bays, self.rows, self.tiers)
         slot_index = 0
         
         for bay in range(1, self.bays + 1):
@@ -116,10 +340,7 @@ class ContainerShip(Bin):
                     # Reefer slots (every 7th slot has power - roughly 14%)
                     is_reefer_slot = (slot_index % 7 == 0)
                     
-                    slot_id = f"B{bay:02d}R{row:02d}T{tier:02d}"
-                    
-                    slot = Slot(
-                        slot_id=slot_id,
+                    self.table.add(
                         bay=bay,
                         row=row,
                         tier=tier,
@@ -130,20 +351,144 @@ class ContainerShip(Bin):
                         max_tier_weight=max_tier_weight,
                         is_reefer_slot=is_reefer_slot
                     )
-                    
-                    slots.append(slot)
                     slot_index += 1
         
-        return slots
+        return [Slot(self.table, index) for index in range(slot_index)]
+    
+    def _generate_stacks(self):
+        """Group slots into bay/row stacks"""
+        stacks = []
+        for start in range(0, len(self.slots), self.tiers):
+            column = self.slots[start:start + self.tiers]
+            stack = Stack(column[0].bay, column[0].row, column, index=len(stacks))
+            for slot in column:
+                slot.stack = stack
+            stacks.append(stack)
+        return stacks
+    
+    def get_stack(self, bay, row):
+        """Get the stack at bay/row"""
+        if not (1 <= bay <= self.bays and 1 <= row <= self.rows):
+            return None
+        return self.stacks[(bay - 1) * self.rows + (row - 1)]
+    
+    def get_stack_top_slots(self):
+        """Get the next free slot of every stack that is not full"""
+        return [stack.next_slot for stack in self.stacks if stack.height < self.tiers]
     
     def get_available_slots(self):
         """Get all unoccupied slots"""
-        return [slot for slot in self.slots if not slot.occupied]
+        occupied = self.table.occupied
+        return [slot for slot in self.slots if not occupied[slot.index]]
+    
+    def get_free_reefer_slots(self):
+        """Get unoccupied slots with reefer power"""
+        occupied = self.table.occupied
+        return [self.slots[i] for i in self._reefer_indices if not occupied[i]]
+    
+    def get_free_slots_in_tier(self, tier):
+        """Get unoccupied slots on one tier"""
+        occupied = self.table.occupied
+        return [self.slots[i] for i in self._tier_indices.get(tier, ()) if not occupied[i]]
+    
+    def get_free_slots_in_column(self, bay, row):
+        """Get unoccupied slots in one bay/row stack, bottom tier first"""
+        if (bay, row) not in self._free_per_column:
+            return []
+        occupied = self.table.occupied
+        return [slot for slot in self.get_stack(bay, row).slots if not occupied[slot.index]]
+    
+    def count_free_slots(self, reefer=False, tier=None, column=None):
+        """
+        Count unoccupied slots in O(1)
+        
+        Args:
+            reefer: Count only reefer-powered slots
+            tier: Count only this tier
+            column: Count only this (bay, row) stack
+        """
+        if reefer:
+            return self._free_reefer_count
+        if tier is not None:
+            return self._free_per_tier.get(tier, 0)
+        if column is not None:
+            return self._free_per_column.get(column, 0)
+        return self.free_count
+    
+    def _set_free(self, slot, is_free):
+        """Update the free-slot counters for one slot"""
+        delta = 1 if is_free else -1
+        self.free_count += delta
+        if slot.is_reefer_slot:
+            self._free_reefer_count += delta
+        self._free_per_tier[slot.tier] += delta
+        self._free_per_column[(slot.bay, slot.row)] += delta
+    
+    @property
+    def slot_dict(self):
+        """Slots keyed by slot_id (built on first use)"""
+        if self._slot_dict is None:
+            self._slot_dict = {slot.slot_id: slot for slot in self.slots}
+        return self._slot_dict
     
     def get_slot(self, bay, row, tier):
         """Get specific slot by bay/row/tier"""
-        slot_id = f"B{bay:02d}R{row:02d}T{tier:02d}"
-        return self.slot_dict.get(slot_id)
+        index = self.table.index_of(bay, row, tier)
+        return self.slots[index] if index >= 0 else None
+    
+    def _hazmat_neighbourhood(self, slot, separation):
+        """Yield slots closer than separation to slot (Manhattan distance)"""
+        offsets = self._hazmat_offsets.get(separation)
+        if offsets is None:
+            reach = separation - 1
+            offsets = [
+                (db, dr, dt)
+                for db in range(-reach, reach + 1)
+                for dr in range(-reach, reach + 1)
+                for dt in range(-reach, reach + 1)
+                if abs(db) + abs(dr) + abs(dt) < separation
+            ]
+            self._hazmat_offsets[separation] = offsets
+        
+        for db, dr, dt in offsets:
+            bay, row, tier = slot.bay + db, slot.row + dr, slot.tier + dt
+            index = self.table.index_of(bay, row, tier)
+            if index >= 0:
+                yield self.slots[index]
+    
+    def _mark_hazmat(self, slot, delta):
+        """Add delta to exclusion counts around a hazmat slot"""
+        for separation, counts in self._hazmat_exclusion.items():
+            for neighbour in self._hazmat_neighbourhood(slot, separation):
+                counts[neighbour.index] += delta
+    
+    def get_hazmat_exclusion(self, separation):
+        """
+        Per-slot count of hazmat containers closer than separation
+        
+        Built from current placements on first use, then kept up to
+        date on every place/remove.
+        """
+        counts = self._hazmat_exclusion.get(separation)
+        if counts is None:
+            counts = array('i', [0]) * len(self.slots)
+            self._hazmat_exclusion[separation] = counts
+            for container in self.placed_containers:
+                if container.is_hazmat():
+                    for neighbour in self._hazmat_neighbourhood(container.assigned_slot, separation):
+                        counts[neighbour.index] += 1
+        return counts
+    
+    def is_hazmat_blocked(self, slot, separation):
+        """Check if slot is within separation of any placed hazmat container"""
+        return self.get_hazmat_exclusion(separation)[slot.index] > 0
+    
+    def find_nearby_hazmat(self, slot, separation):
+        """Return a placed hazmat container closer than separation, or None"""
+        for neighbour in self._hazmat_neighbourhood(slot, separation):
+            if neighbour.occupied and neighbour.container.is_hazmat():
+                return neighbour.container
+        return None
     
     def calculate_current_stability(self):
         """Calculate current stability with placed containers"""
@@ -154,16 +499,7 @@ class ContainerShip(Bin):
                 'is_stable': True
             }
         
-        total_moment = self.kg_lightship * self.lightship_weight
-        total_weight = self.lightship_weight
-        
-        for container in self.placed_containers:
-            if container.assigned_slot:
-                slot = container.assigned_slot
-                total_moment += container.total_weight * slot.z_pos
-                total_weight += container.total_weight
-        
-        kg = total_moment / total_weight
+        kg = self.vertical_moment / self.displacement
         gm = self.kb + self.bm - kg
         
         self.current_kg = round(kg, 3)
@@ -173,29 +509,187 @@ class ContainerShip(Bin):
             'kg': self.current_kg,
             'gm': self.current_gm,
             'is_stable': gm >= self.gm_min,
-            'total_weight': round(total_weight, 2)
+            'total_weight': round(self.displacement, 2)
         }
     
+    def predict_gm(self, weight, z_pos):
+        """
+        GM if a container of given weight were added at height z_pos
+        
+        Uses the running totals, so it costs O(1) regardless of load
+        """
+        kg = (self.vertical_moment + weight * z_pos) / (self.displacement + weight)
+        return self.kb + self.bm - kg
+    
+    def _occupy(self, slot, container):
+        """Mark slot as holding container and update the slot indexes"""
+        slot.place_container(container)
+        slot.stack.refresh()
+        self._set_free(slot, False)
+        if container.is_hazmat():
+            self._mark_hazmat(slot, 1)
+    
+    def _vacate(self, slot, container):
+        """Clear container from slot and update the slot indexes"""
+        slot.occupied = False
+        slot.container = None
+        slot.stack.refresh()
+        self._set_free(slot, True)
+        if container.is_hazmat():
+            self._mark_hazmat(slot, -1)
+    
+    def _totals(self):
+        return (self.vertical_moment, self.displacement, self.current_kg, self.current_gm)
+    
+    @staticmethod
+    def _container_fields(container):
+        return (container.assigned_slot, container.bay, container.row, container.tier, container.position)
+    
+    @staticmethod
+    def _set_container_fields(container, fields):
+        container.assigned_slot, container.bay, container.row, container.tier, container.position = fields
+    
     def place_container_in_slot(self, container, slot):
         """Place container in specific slot and update tracking"""
         if not slot.can_place(container):
             return False
         
-        slot.place_container(container)
+        if self._undo_log is not None:
+            self._undo_log.append((UNDO_PLACE, container, slot, self._totals(), self._container_fields(container)))
+        
+        self._occupy(slot, container)
         container.assigned_slot = slot
         container.bay = slot.bay
         container.row = slot.row
         container.tier = slot.tier
         container.position = [slot.x_pos, slot.y_pos, slot.z_pos]
         
+        self._placed_position[container] = len(self.placed_containers)
         self.placed_containers.append(container)
+        self.vertical_moment += container.total_weight * slot.z_pos
+        self.displacement += container.total_weight
         self.calculate_current_stability()
         
         return True
     
+    def remove_container(self, container, from_top=True):
+        """
+        Remove a placed container and update tracking
+        
+        Only the top container of a stack can be lifted; anything below
+        it would leave the boxes above floating.
+        
+        Args:
+            container: Placed container to remove
+            from_top: Enforce the top-of-stack rule (turn off only for
+                      plans packed without the support rule, where boxes
+                      may already float)
+        
+        Raises:
+            ValueError: If from_top and container has containers on top of it
+        """
+        slot = container.assigned_slot
+        if slot is None or slot.container is not container:
+            return False
+        if from_top and slot.stack.top_container is not container:
+            raise ValueError(f"Container {container.container_id} is not on top of its stack")
+        
+        position = self._placed_position[container]
+        if self._undo_log is not None:
+            self._undo_log.append((UNDO_REMOVE, container, slot, self._totals(), self._container_fields(container),
+                                   position))
+        
+        self._vacate(slot, container)
+        self._unlist(container)
+        self.vertical_moment -= container.total_weight * slot.z_pos
+        self.displacement -= container.total_weight
+        
+        container.assigned_slot = None
+        container.bay = None
+        container.row = None
+        container.tier = None
+        container.position = START_POSITION
+        
+        self.calculate_current_stability()
+        
+        return True
+    
+    def _unlist(self, container):
+        """Drop container from placed_containers in O(1) by moving the last one into its place"""
+        position = self._placed_position.pop(container)
+        last = self.placed_containers.pop()
+        if last is not container:
+            self.placed_containers[position] = last
+            self._placed_position[last] = position
+    
+    def _relist(self, container, position):
+        """Inverse of _unlist: put container back at position, the displaced one back at the end"""
+        if position < len(self.placed_containers):
+            moved = self.placed_containers[position]
+            self._placed_position[moved] = len(self.placed_containers)
+            self.placed_containers.append(moved)
+            self.placed_containers[position] = container
+        else:
+            self.placed_containers.append(container)
+        self._placed_position[container] = position
+    
+    def savepoint(self):
+        """
+        Mark the current loading state so rollback() can return to it
+        
+        From the first savepoint until the outermost one is released,
+        every place/remove appends one undo entry: the slot, container
+        fields and stability totals as they were before the change.
+        """
+        if self._undo_log is None:
+            self._undo_log = []
+        return len(self._undo_log)
+    
+    def rollback(self, savepoint):
+        """
+        Undo every place/remove since savepoint, newest first
+        
+        Occupancy, stack weights, free-slot and hazmat indexes and
+        container fields are restored, and stability totals are set back
+        to their exact saved values rather than recomputed.
+        
+        Returns:
+            list: Slots that changed (for callers keeping derived state)
+        """
+        log = self._undo_log
+        if log is None or not 0 <= savepoint <= len(log):
+            raise ValueError(f"Unknown savepoint {savepoint}")
+        
+        touched = []
+        while len(log) > savepoint:
+            entry = log.pop()
+            action, container, slot, totals, fields = entry[:5]
+            if action == UNDO_PLACE:
+                self._vacate(slot, container)
+                self.placed_containers.pop()
+                del self._placed_position[container]
+            else:
+                self._occupy(slot, container)
+                self._relist(container, entry[5])
+            self.vertical_moment, self.displacement, self.current_kg, self.current_gm = totals
+            self._set_container_fields(container, fields)
+            touched.append(slot)
+        
+        return touched
+    
+    def release(self, savepoint):
+        """
+        Keep the changes made since savepoint
+        
+        Releasing the outermost savepoint (0) drops the undo log and
+        stops recording.
+        """
+        if savepoint == 0:
+            self._undo_log = None
+    
     def get_utilization(self):
         """Calculate slot utilization percentage"""
-        occupied = len([s for s in self.slots if s.occupied])
+        occupied = len(self.slots) - self.free_count
         return round(occupied / len(self.slots) * 100, 2)
     
     def get_summary(self):
@@ -222,4 +716,36 @@ class ContainerShip(Bin):
         return counts
     
     def __repr__(self):
-        return f"ContainerShip({self.ship_name}, {self.bays}x{self.rows}x{self.tiers}, {len(self.placed_containers)} loaded)"
\ No newline at end of file
+        return f"ContainerShip({self.ship_name}, {self.bays}x{self.rows}x{self.tiers}, {len(self.placed_containers)} loaded)"
+
+
+class ShipTemplateRegistry:
+    """
+    Builds each ship layout once and hands out cheap empty copies
+    """
+    
+    def __init__(self):
+        self._templates = {}
+    
+    def register(self, key, ship):
+        """Store an empty ship as the template for key"""
+        self._templates[key] = ship
+    
+    def get(self, key, factory=None):
+        """
+        Get an empty ship for key
+        
+        Args:
+            key: Template identifier
+            factory: Callable building the ship if key is not registered yet
+        """
+        template = self._templates.get(key)
+        if template is None:
+            if factory is None:
+                raise KeyError(f"No ship template registered for {key!r}")
+            template = factory()
+            self._templates[key] = template
+        return template.fresh_copy()
+    
+    def __contains__(self, key):
+        return key in self._templates
@@ -0,0 +1,108 @@
+"""
+SlotTable - compact structure-of-arrays store for ship slots
+"""
+from array import array
+import copy
+
+
+class SlotTable:
+    """
+    Parallel arrays holding every slot attribute, indexed by a dense slot index
+
+    Slot objects are thin views over one row of this table. Geometry is
+    fixed once built; occupancy, stack weight and containers change as
+    the ship is loaded.
+    """
+
+    def __init__(self, bays, rows, tiers):
+        """
+        Args:
+            bays: Number of bays
+            rows: Number of rows
+            tiers: Number of tiers
+        """
+        self.bays = bays
+        self.rows = rows
+        self.tiers = tiers
+
+        # Geometry and limits
+        self.bay = array('H')
+        self.row = array('H')
+        self.tier = array('H')
+        self.x_pos = array('d')
+        self.y_pos = array('d')
+        self.z_pos = array('d')
+        self.max_stack_weight = array('d')
+        self.max_tier_weight = array('d')
+        self.is_reefer_slot = bytearray()
+
+        # Loading state
+        self.occupied = bytearray()
+        self.current_stack_weight = array('d')
+        self.containers = []
+
+        # (bay, row, tier) -> slot index, -1 where there is no slot
+        self.grid = array('l', [-1]) * (bays * rows * tiers)
+
+        # Slot IDs that differ from B##R##T## (standalone slots only)
+        self.labels = None
+
+    def __len__(self):
+        return len(self.occupied)
+
+    def _grid_position(self, bay, row, tier):
+        """Offset of bay/row/tier in the grid (None if out of range)"""
+        if not (1 <= bay <= self.bays and 1 <= row <= self.rows and 1 <= tier <= self.tiers):
+            return None
+        return ((bay - 1) * self.rows + (row - 1)) * self.tiers + (tier - 1)
+
+    def add(self, bay, row, tier, x_pos, y_pos, z_pos,
+            max_stack_weight, max_tier_weight, is_reefer_slot=False):
+        """Append a slot and return its index"""
+        index = len(self.occupied)
+
+        self.bay.append(bay)
+        self.row.append(row)
+        self.tier.append(tier)
+        self.x_pos.append(x_pos)
+        self.y_pos.append(y_pos)
+        self.z_pos.append(z_pos)
+        self.max_stack_weight.append(max_stack_weight)
+        self.max_tier_weight.append(max_tier_weight)
+        self.is_reefer_slot.append(1 if is_reefer_slot else 0)
+
+        self.occupied.append(0)
+        self.current_stack_weight.append(0)
+        self.containers.append(None)
+
+        self.grid[self._grid_position(bay, row, tier)] = index
+        return index
+
+    def index_of(self, bay, row, tier):
+        """Slot index at bay/row/tier, or -1 if there is none"""
+        position = self._grid_position(bay, row, tier)
+        if position is None:
+            return -1
+        return self.grid[position]
+
+    def slot_id(self, index):
+        """Format the B##R##T## identifier of a slot"""
+        if self.labels:
+            return self.labels[index]
+        return f"B{self.bay[index]:02d}R{self.row[index]:02d}T{self.tier[index]:02d}"
+
+    def reset(self):
+        """Clear occupancy, stack weights and containers in place"""
+        size = len(self.occupied)
+        self.occupied[:] = bytes(size)
+        self.current_stack_weight[:] = array('d', bytes(8 * size))
+        self.containers[:] = [None] * size
+
+    def empty_copy(self):
+        """New table sharing this table's geometry with its own empty loading state"""
+        table = copy.copy(self)
+        size = len(self.occupied)
+        table.occupied = bytearray(size)
+        table.current_stack_weight = array('d', bytes(8 * size))
+        table.containers = [None] * size
+        return table
@@ -0,0 +1,312 @@
+"""
+NumPy slot engine - batched feasibility and scoring for MaritimePacker
+"""
+import time
+
+import numpy as np
+
+
+class VectorizedSlotEngine:
+    """
+    Keeps slot attributes as arrays and evaluates every slot for a
+    container in one pass
+
+    Produces the same slot choice as MaritimePacker's scalar path.
+    """
+
+    # Score slack for re-checking near-best slots with the scalar scorer
+    # (np.round and round() can disagree by 0.001m of GM = 0.02 points)
+    TIE_TOLERANCE = 0.05
+
+    def __init__(self, packer):
+        """
+        Args:
+            packer: MaritimePacker whose ship, checker and scoring to mirror
+        """
+        self.packer = packer
+        self.ship = packer.ship
+        self.checker = packer.checker
+
+        # Zero-copy views over the ship's SlotTable columns
+        table = self.ship.table
+        self.bay = np.frombuffer(table.bay, dtype=np.uint16).astype(np.int64)
+        self.row = np.frombuffer(table.row, dtype=np.uint16).astype(np.int64)
+        self.tier = np.frombuffer(table.tier, dtype=np.uint16).astype(np.int64)
+        self.z_pos = np.frombuffer(table.z_pos, dtype=np.float64)
+        self.is_reefer_slot = np.frombuffer(table.is_reefer_slot, dtype=bool)
+        self.max_tier_weight = np.frombuffer(table.max_tier_weight, dtype=np.float64)
+        self.max_stack_weight = np.frombuffer(table.max_stack_weight, dtype=np.float64)
+        self.occupied = np.frombuffer(table.occupied, dtype=bool)
+        self.stack_weight = np.frombuffer(table.current_stack_weight, dtype=np.float64)
+
+        # Per-stack top slot (-1 when full), and per slot the weight headroom
+        # it must respect (its stack's above the stack height, none below)
+        stacks = self.ship.stacks
+        self.slot_stack = np.array([slot.stack.index for slot in self.ship.slots], dtype=np.int64)
+        self.stack_slots = [np.array([slot.index for slot in stack.slots], dtype=np.int64) for stack in stacks]
+        self.stack_top = np.full(len(stacks), -1, dtype=np.int64)
+        self.slot_headroom = np.full(len(self.ship.slots), np.inf)
+
+        # Containers per stack and discharge port, for the overstow score
+        rotation = packer.rotation
+        self.stack_ports = np.zeros((len(stacks), len(rotation) + 1 if rotation else 0), dtype=np.int64)
+
+        # Score terms that only depend on slot position
+        center_row = self.ship.rows / 2
+        self.heavy_tier_score = (8 - self.tier) * 10
+        self.row_score = (center_row - np.abs(self.row - center_row)) * 5
+        self.bay_score = self.bay * 2
+
+        self.sync()
+
+    def sync(self):
+        """Reload stack pointers and headroom from the ship's stacks"""
+        for stack in self.ship.stacks:
+            self.update_stack(stack)
+
+    def update_slot(self, slot):
+        """Refresh after slot was placed into or cleared"""
+        self.update_stack(slot.stack)
+
+    def update_stack(self, stack):
+        """Refresh the top pointer and slot headroom of one stack"""
+        next_slot = stack.next_slot
+        self.stack_top[stack.index] = next_slot.index if next_slot else -1
+        slots = self.stack_slots[stack.index]
+        self.slot_headroom[slots[:stack.height]] = np.inf
+        self.slot_headroom[slots[stack.height:]] = stack.headroom
+        if self.packer.rotation:
+            self.stack_ports[stack.index] = self.packer.rotation.stack_ports(stack)
+
+    def candidate_slots(self, container):
+        """Indices of slots the container could go in, before stability"""
+        if self.checker.require_support:
+            indices = self.stack_top[self.stack_top >= 0]
+        else:
+            indices = np.arange(len(self.occupied))
+        candidates = indices[self.feasible_mask(container, indices)]
+
+        # Constraints registered on the checker run slot by slot
+        for stage in self.checker.custom_stages(container.cargo_type):
+            candidates = candidates[self.stage_mask(stage, container, candidates)]
+        return candidates
+
+    def stage_mask(self, stage, container, indices):
+        """Boolean mask over indices of slots passing a registered stage"""
+        slots = self.ship.slots
+        return np.array(
+            [stage.check(container, slots[index], self.ship)[0] for index in indices.tolist()],
+            dtype=bool
+        )
+
+    def feasible_mask(self, container, indices):
+        """Boolean mask over indices of slots passing the per-slot checks"""
+        weight = container.total_weight
+        mask = ~self.occupied[indices]
+
+        if self.checker.check_weight:
+            mask &= self.weight_fits(weight, indices)
+
+        if self.checker.check_reefer and container.is_reefer():
+            mask &= self.is_reefer_slot[indices]
+
+        if container.is_hazmat():
+            mask &= self.hazmat_exclusion()[indices] == 0
+
+        return mask
+
+    def hazmat_exclusion(self):
+        """View over the ship's per-slot hazmat exclusion counts"""
+        exclusion = self.ship.get_hazmat_exclusion(self.checker.hazmat_separation)
+        return np.frombuffer(exclusion, dtype=np.intc)
+
+    def weight_fits(self, weight, indices):
+        """Boolean mask over indices of slots passing check_weight_limit"""
+        fits = weight <= self.max_tier_weight[indices]
+        fits &= self.stack_weight[indices] + weight <= self.max_stack_weight[indices]
+        fits &= weight <= self.slot_headroom[indices]
+        return fits
+
+    def violation_masks(self, container):
+        """
+        Per-constraint masks over every slot, True where the slot breaks
+        the constraint, in check order with stability last
+
+        Returns:
+            dict: constraint name -> boolean array over all slots
+        """
+        weight = container.total_weight
+        masks = {'occupied': self.occupied.copy()}
+
+        if self.checker.require_support:
+            # Free slots other than a stack's next tier (occupied ones already fail)
+            masks['support'] = ~self.occupied
+            masks['support'][self.stack_top[self.stack_top >= 0]] = False
+
+        if self.checker.check_weight:
+            masks['weight'] = self.weight_excess(weight) > 0
+
+        if self.checker.check_reefer and container.is_reefer():
+            masks['reefer'] = ~self.is_reefer_slot
+
+        if container.is_hazmat():
+            masks['hazmat'] = self.hazmat_exclusion() > 0
+
+        all_slots = np.arange(len(self.occupied))
+        for stage in self.checker.custom_stages(container.cargo_type):
+            masks[stage.name] = ~self.stage_mask(stage, container, all_slots)
+
+        masks['stability'] = self.predict_gm(weight, all_slots) < self.packer.gm_threshold
+        return masks
+
+    def weight_excess(self, weight):
+        """Tonnes by which weight breaks each slot's tier, stack or headroom limit (<= 0 if none)"""
+        return np.maximum.reduce([
+            weight - self.max_tier_weight,
+            self.stack_weight + weight - self.max_stack_weight,
+            weight - self.slot_headroom,
+        ])
+
+    def count_rejections(self, container, indices, profile):
+        """
+        Record in profile the first check each slot fails, in the order
+        the scalar path applies them
+        """
+        weight = container.total_weight
+        passing = np.ones(len(indices), dtype=bool)
+        checks = []
+
+        # Candidate filters first, as in the scalar path
+        if self.checker.check_reefer and container.is_reefer():
+            checks.append(('reefer', self.is_reefer_slot[indices]))
+
+        if container.is_hazmat():
+            checks.append(('hazmat', self.hazmat_exclusion()[indices] == 0))
+
+        checks.append(('occupied', ~self.occupied[indices]))
+
+        if self.checker.check_weight:
+            checks.append(('weight', self.weight_fits(weight, indices)))
+
+        for stage in self.checker.custom_stages(container.cargo_type):
+            checks.append((stage.name, self.stage_mask(stage, container, indices)))
+
+        for constraint, mask in checks:
+            profile.reject(constraint, int(np.count_nonzero(passing & ~mask)))
+            passing &= mask
+
+    def predict_gm(self, weight, indices):
+        """GM for placing weight in each slot (same arithmetic as ship.predict_gm)"""
+        ship = self.ship
+        kg = (ship.vertical_moment + weight * self.z_pos[indices]) / (ship.displacement + weight)
+        return ship.kb + ship.bm - kg
+
+    def _scored_candidates(self, container):
+        """Stable candidate slot indices, their predicted GM and (np.round based) scores"""
+        threshold = self.packer.gm_threshold
+        profile = self.packer.profile
+        if profile is not None:
+            return self._scored_candidates_profiled(container, profile)
+
+        candidates = self.candidate_slots(container)
+        gm = self.predict_gm(container.total_weight, candidates)
+        stable = gm >= threshold
+        candidates = candidates[stable]
+        gm = gm[stable]
+
+        return candidates, gm, self._score(container, candidates, gm)
+
+    def _score(self, container, candidates, gm):
+        """Slot scores for stable candidates with predicted gm"""
+        # Terms added in _calculate_slot_score's order so the sums match it
+        score = (np.round(gm, 3) - self.packer.gm_threshold) * 20
+        if container.total_weight > 20:
+            score = self.heavy_tier_score[candidates] + score
+        score += self.row_score[candidates]
+        score += self.bay_score[candidates]
+
+        rotation = self.packer.rotation
+        if rotation:
+            port = rotation.discharge_index(container)
+            overstows = self.stack_ports[self.slot_stack[candidates], :port].sum(axis=1)
+            score -= self.packer.restow_penalty * overstows
+        return score
+
+    def _scored_candidates_profiled(self, container, profile):
+        """_scored_candidates with each batch step timed and rejections counted"""
+        clock = time.perf_counter
+
+        start = clock()
+        if self.checker.require_support:
+            examined = self.stack_top[self.stack_top >= 0]
+        else:
+            examined = np.arange(len(self.occupied))
+        profile.add('candidates', clock() - start)
+
+        start = clock()
+        candidates = self.candidate_slots(container)
+        profile.add('constraints', clock() - start, len(examined))
+        self.count_rejections(container, examined, profile)
+
+        start = clock()
+        gm = self.predict_gm(container.total_weight, candidates)
+        stable = gm >= self.packer.gm_threshold
+        profile.add('stability', clock() - start, len(candidates))
+        profile.reject('stability', int(len(candidates) - np.count_nonzero(stable)))
+        candidates = candidates[stable]
+        gm = gm[stable]
+
+        start = clock()
+        score = self._score(container, candidates, gm)
+        profile.add('scoring', clock() - start, len(candidates))
+
+        profile.searches += 1
+        profile.slots_examined += len(examined)
+        return candidates, gm, score
+
+    def _break_tie(self, container, candidates, gm, score):
+        """Index of the best candidate, rescoring front-runners like the scalar sort"""
+        top = np.argmax(score)
+        near = score >= score[top] - self.TIE_TOLERANCE
+        near_gm = gm[near]
+        if near_gm.size == 1:
+            return candidates[top]
+
+        # Scores match the scalar ones exactly unless np.round and round()
+        # disagree on a front-runner's GM; then rescore those with round()
+        exact_gm = [round(value, 3) for value in near_gm.tolist()]
+        if np.round(near_gm, 3).tolist() == exact_gm:
+            return candidates[top]
+        best = candidates[near]
+        return best[np.argmax(self._score(container, best, np.array(exact_gm)))]
+
+    def find_best_slot(self, container):
+        """Vectorized equivalent of MaritimePacker._find_best_slot"""
+        candidates, gm, score = self._scored_candidates(container)
+        if candidates.size == 0:
+            return None
+
+        # Rescore the front-runners exactly so ties break like the scalar sort
+        profile = self.packer.profile
+        start = time.perf_counter() if profile is not None else 0.0
+        best = self._break_tie(container, candidates, gm, score)
+        if profile is not None:
+            profile.add('sort', time.perf_counter() - start)
+        return self.ship.slots[best]
+
+    def rank_slots(self, container, limit=None):
+        """Vectorized equivalent of MaritimePacker._rank_slots"""
+        candidates, gm, score = self._scored_candidates(container)
+        if candidates.size == 0:
+            return []
+
+        profile = self.packer.profile
+        start = time.perf_counter() if profile is not None else 0.0
+        best = self._break_tie(container, candidates, gm, score)
+        order = np.argsort(-score, kind='stable')
+        ranked = [best] + [index for index in candidates[order].tolist() if index != best]
+        if profile is not None:
+            profile.add('sort', time.perf_counter() - start)
+        scores = dict(zip(candidates.tolist(), score.tolist()))
+
+        return [(self.ship.slots[index], scores[index]) for index in ranked[:limit]]
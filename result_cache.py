@@ -0,0 +1,120 @@
+"""
+LRU cache for optimization results with single-flight request coalescing
+"""
+from concurrent.futures import Future
+from collections import OrderedDict
+import json
+import threading
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache of JSON-serializable results
+
+    Concurrent callers asking for the same key while it is being computed
+    wait for that one computation instead of starting their own.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, sizeof=None):
+        """
+        Args:
+            max_bytes: Total size kept before evicting least recently used
+            sizeof: Callable estimating an entry's size in bytes
+                    (defaults to its serialized JSON length)
+        """
+        self.max_bytes = max_bytes
+        if sizeof is not None:
+            self.sizeof = sizeof
+        self.current_bytes = 0
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._in_flight = {}  # key -> Future
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def sizeof(value):
+        """Approximate size of a result as serialized JSON"""
+        return len(json.dumps(value, default=str))
+
+    def get(self, key):
+        """Cached value for key, or None (never waits for or starts a computation)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for key, computing it at most once
+
+        Args:
+            key: Hashable cache key
+            compute: Zero-argument callable producing the value
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        # Whatever fails (compute, sizing or the insert), waiters must be
+        # released and the key freed for the next caller
+        try:
+            value = compute()
+            size = self.sizeof(value)
+            with self._lock:
+                if size <= self.max_bytes:
+                    self._entries[key] = (value, size)
+                    self.current_bytes += size
+                    self._evict()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+        return value
+
+    def _evict(self):
+        """Drop least recently used entries until under max_bytes"""
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+            }
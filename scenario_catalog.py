@@ -0,0 +1,135 @@
+"""
+In-memory scenario catalog - metadata, ship specs and manifest index
+"""
+from types import MappingProxyType
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+from manifest_store import get_manifest_store
+
+
+class Catalog:
+    """
+    Immutable snapshot of the scenario files
+
+    Response bodies are serialized once when the snapshot is built, so
+    serving them is a dict lookup.
+    """
+
+    def __init__(self, scenarios, ship_specs, manifest_sizes, signature):
+        """
+        Args:
+            scenarios: List of scenario summary dicts (as served by /scenarios)
+            ship_specs: Ship specifications row as a dict
+            manifest_sizes: scenario_id -> number of manifest rows
+            signature: File mtimes the snapshot was built from
+        """
+        self.signature = signature
+        self.ship_specs = MappingProxyType(dict(ship_specs))
+        self.scenarios = tuple(MappingProxyType(dict(s)) for s in scenarios)
+        self.by_id = MappingProxyType({s['id']: s for s in self.scenarios})
+        self.manifest_sizes = MappingProxyType(dict(manifest_sizes))
+
+        self.scenarios_body = self._encode([dict(s) for s in self.scenarios])
+        self.ship_body = self._encode(dict(self.ship_specs))
+        self.scenario_bodies = MappingProxyType({
+            s['id']: self._encode(dict(s, manifest_rows=self.manifest_sizes.get(s['id'], 0)))
+            for s in self.scenarios
+        })
+
+        digest = hashlib.sha1(self.scenarios_body + self.ship_body)
+        digest.update(json.dumps(sorted(self.manifest_sizes.items())).encode())
+        self.etag = f'"{digest.hexdigest()[:16]}"'
+
+    @staticmethod
+    def _encode(value):
+        return json.dumps(value).encode()
+
+
+class ScenarioCatalog:
+    """
+    Holds the current Catalog and swaps in a new one when files change
+
+    refresh() compares file mtimes and rebuilds only if one moved; the
+    new snapshot replaces the old with a single reference assignment, so
+    readers always see a complete catalog. A background thread started
+    with start_watching() keeps stat calls off the request path.
+    """
+
+    def __init__(self, metadata_path='scenario_metadata.csv',
+                 ship_specs_path='ship_specifications.csv',
+                 manifests_path='container_manifests.csv'):
+        self.metadata_path = metadata_path
+        self.ship_specs_path = ship_specs_path
+        self.manifests_path = manifests_path
+        self._catalog = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def _signature(self):
+        return tuple(
+            os.stat(path).st_mtime_ns
+            for path in (self.metadata_path, self.ship_specs_path, self.manifests_path)
+        )
+
+    def _build(self, signature):
+        metadata = pd.read_csv(self.metadata_path)
+        scenarios = [
+            {
+                "id": row["scenario_id"],
+                "containers": row["num_containers"],
+                "teu": row["actual_teu"],
+                "sea_state": row["sea_state"],
+                "utilization": row["actual_utilization"],
+            }
+            for row in metadata.to_dict('records')
+        ]
+        ship_specs = pd.read_csv(self.ship_specs_path).iloc[0].to_dict()
+        ship_specs = {key: value.item() if hasattr(value, 'item') else value for key, value in ship_specs.items()}
+        manifest_sizes = get_manifest_store(self.manifests_path).scenario_sizes()
+        return Catalog(scenarios, ship_specs, manifest_sizes, signature)
+
+    def refresh(self):
+        """Reload if any source file changed; returns True when reloaded"""
+        with self._lock:
+            signature = self._signature()
+            if self._catalog is not None and self._catalog.signature == signature:
+                return False
+            self._catalog = self._build(signature)
+            return True
+
+    @property
+    def current(self):
+        """The latest Catalog (built on first use)"""
+        catalog = self._catalog
+        if catalog is None:
+            self.refresh()
+            catalog = self._catalog
+        return catalog
+
+    def start_watching(self, interval=2.0):
+        """Poll file mtimes every interval seconds in a daemon thread"""
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+
+        def watch():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except (OSError, ValueError, KeyError):
+                    # Files mid-write or briefly missing: keep the last good catalog
+                    pass
+
+        self._watcher = threading.Thread(target=watch, daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
@@ -0,0 +1,82 @@
+"""
+Solver metrics - histograms of packing profiles across API solves
+"""
+import bisect
+import threading
+
+# Bucket upper bounds in seconds (the last bucket is +inf)
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram with a running sum and count"""
+
+    def __init__(self, buckets=SECONDS_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self):
+        """Cumulative bucket counts keyed by upper bound, like Prometheus"""
+        cumulative = {}
+        running = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            running += count
+            cumulative[str(bound)] = running
+        return {'buckets': cumulative, 'sum': round(self.sum, 6), 'count': self.count}
+
+
+class SolveMetrics:
+    """
+    Aggregates metrics['profile'] of finished solves
+
+    Keeps one seconds histogram per phase and for the whole search, plus
+    running totals of slots examined and rejections per constraint.
+    """
+
+    def __init__(self, buckets=SECONDS_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.solves = 0
+            self.phases = {}
+            self.total = Histogram(self.buckets)
+            self.slots_examined = 0
+            self.searches = 0
+            self.rejections = {}
+
+    def observe(self, profile):
+        """Record one solve's profile (a PackingProfile.to_dict() result)"""
+        with self._lock:
+            self.solves += 1
+            for phase, entry in profile['phases'].items():
+                if phase not in self.phases:
+                    self.phases[phase] = Histogram(self.buckets)
+                self.phases[phase].observe(entry['seconds'])
+            self.total.observe(profile['total_seconds'])
+            self.slots_examined += profile['slots_examined']
+            self.searches += profile['searches']
+            for constraint, count in profile['rejections'].items():
+                self.rejections[constraint] = self.rejections.get(constraint, 0) + count
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'solves': self.solves,
+                'seconds': {
+                    'total': self.total.to_dict(),
+                    **{phase: histogram.to_dict() for phase, histogram in self.phases.items()},
+                },
+                'searches': self.searches,
+                'slots_examined': self.slots_examined,
+                'rejections': dict(self.rejections),
+            }
@@ -31,6 +31,8 @@ ship = ContainerShip(
 print(f"✓ {ship}")
 print(f"  Total slots: {len(ship.slots)}")
 print(f"  Available slots: {len(ship.get_available_slots())}")
+print(f"  Free reefer slots: {ship.count_free_slots(reefer=True)}")
+print(f"  Free slots on tier 1: {len(ship.get_free_slots_in_tier(1))}")
 
 # Check slot structure
 print("\n2. Checking Slot Structure...")
@@ -83,9 +85,57 @@ print(f"  Stable: {'✓ YES' if stability['is_stable'] else '✗ NO'}")
 print("\n6. Ship Summary...")
 summary = ship.get_summary()
 print(f"  Utilization: {summary['utilization']}%")
+print(f"  Free slots in column B01R01: {ship.count_free_slots(column=(1, 1))}")
 print(f"  Occupied slots: {summary['occupied_slots']}/{summary['total_slots']}")
 print(f"  Containers by type: {summary['containers_by_type']}")
 
+# Remove a container
+print("\n7. Removing a Container...")
+removed_slot = containers[2].assigned_slot
+ship.remove_container(containers[2])
+print(f"  ✓ Removed {containers[2].container_id}")
+stability = ship.calculate_current_stability()
+print(f"  Total weight: {stability['total_weight']}t")
+print(f"  GM: {stability['gm']}m")
+predicted_gm = round(ship.predict_gm(containers[2].total_weight, removed_slot.z_pos), 3)
+print(f"  Placing it back in {removed_slot.slot_id} would give GM: {predicted_gm}m")
+
+# Savepoint and rollback
+print("\n8. Rolling Back Trial Moves...")
+gm_before = ship.current_gm
+savepoint = ship.savepoint()
+ship.place_container_in_slot(containers[2], removed_slot)
+ship.remove_container(containers[0])
+print(f"  Trial GM: {ship.calculate_current_stability()['gm']}m ({len(ship.placed_containers)} placed)")
+ship.rollback(savepoint)
+ship.release(savepoint)
+print(f"  ✓ Rolled back: GM {ship.current_gm}m ({len(ship.placed_containers)} placed)")
+print(f"  Restored exactly: {'✓ YES' if ship.current_gm == gm_before and containers[2].assigned_slot is None else '✗ NO'}")
+assert ship.current_gm == gm_before and containers[2].assigned_slot is None
+assert containers[0].assigned_slot.container is containers[0] and len(ship.placed_containers) == 3
+
+# Only the top of a stack can be lifted
+print("\n  Lifting from a stack...")
+ship.place_container_in_slot(containers[2], ship.get_slot(1, 1, 2))
+try:
+    ship.remove_container(containers[0])
+    buried_refused = False
+except ValueError as e:
+    buried_refused = True
+    print(f"  ✓ Refused: {e}")
+assert buried_refused and containers[0].assigned_slot is not None
+assert ship.remove_container(containers[2]) and ship.remove_container(containers[0])
+print(f"  ✓ Lifted {containers[2].container_id}, then {containers[0].container_id}")
+
+# Reset and copy
+print("\n9. Resetting and Copying the Ship...")
+copy_ship = ship.fresh_copy()
+print(f"  ✓ Fresh copy: {copy_ship}")
+ship.reset()
+print(f"  ✓ After reset: {ship} ({ship.count_free_slots()} free slots)")
+assert ship.count_free_slots() == len(ship.slots) and not ship.placed_containers
+assert copy_ship.count_free_slots() == len(copy_ship.slots)
+
 print("\n" + "=" * 60)
 print("ContainerShip class working correctly!")
 print("=" * 60)
\ No newline at end of file
@@ -89,10 +89,47 @@ print(f"  Predicted GM: {gm}m (required: 0.3m)")
 
 print("\n5. Testing Complete Constraint Check...")
 test_container2 = MaritimeContainer('FINAL', '20ft', 'general', 16.0, (6.06, 2.44, 2.59))
-test_slot2 = ship.get_slot(4, 4, 2)
+test_slot2 = ship.get_slot(4, 4, 1)
 
 can_place, reason = checker.check_all_constraints(test_container2, test_slot2, ship)
 print(f"  All constraints: {'✓ PASS' if can_place else '✗ FAIL'} - {reason}")
+assert can_place, reason
+
+print("\n6. Testing Stack Support and Weight...")
+floating_slot = ship.get_slot(5, 5, 2)
+can_place, reason = checker.check_all_constraints(test_container2, floating_slot, ship)
+print(f"  Tier 2 on empty stack: {'✓ OK' if can_place else '✗ REJECTED'} - {reason}")
+assert not can_place and reason == "No support below", reason
+assert checker.find_violation(test_container2, floating_slot, ship)[0] == 'support'
+
+stack = ship.get_stack(5, 5)
+for i in range(5):
+    box = MaritimeContainer(f'STACK{i+1}', '20ft', 'general', 28.0, (6.06, 2.44, 2.59))
+    ship.place_container_in_slot(box, stack.next_slot)
+print(f"  {stack} (next free tier: {stack.next_free_tier})")
+
+heavy_top = MaritimeContainer('TOP', '20ft', 'general', 25.0, (6.06, 2.44, 2.59))
+can_place, reason = checker.check_all_constraints(heavy_top, stack.next_slot, ship)
+print(f"  25t on top of 140t stack: {'✓ OK' if can_place else '✗ REJECTED'} - {reason}")
+assert not can_place and 'stack' in reason.lower(), reason
+
+print("\n7. Testing Constraint Pipeline...")
+checker.register('stacking_order', checker.check_stacking_order, cost=2.0)
+stack = ship.get_stack(3, 3)
+ship.place_container_in_slot(MaritimeContainer('BASE', '20ft', 'general', 20.0, (6.06, 2.44, 2.59)), stack.next_slot)
+light_top = MaritimeContainer('LIGHT', '20ft', 'general', 12.0, (6.06, 2.44, 2.59))
+heavier_top = MaritimeContainer('HEAVY', '20ft', 'general', 30.0, (6.06, 2.44, 2.59))
+violations = []
+for box in (light_top, heavier_top):
+    constraint, reason = checker.find_violation(box, stack.next_slot, ship)
+    violations.append(constraint)
+    print(f"  {box.total_weight}t on the stack: {'✓ OK' if constraint is None else '✗ ' + constraint} - {reason}")
+assert violations == [None, 'stacking_order'], violations
+
+valid = [checker.filter_slots(box, ship.slots, ship) for box in (light_top, heavier_top) * 300]
+print(f"  Valid slots for a 12t box: {len(valid[0])}, stage order: {[stage['name'] for stage in checker.pipeline_stats()]}")
+assert valid[0] == [slot for slot in ship.slots if checker.check_all_constraints(light_top, slot, ship)[0]]
+assert stack.next_slot in valid[0] and stack.next_slot not in valid[1]
 
 print("\n" + "=" * 60)
 print("Constraint checking system working!")
@@ -4,10 +4,30 @@ Test maritime packer with realistic scenario
 from py3dbc.maritime.container import MaritimeContainer
 from py3dbc.maritime.ship import ContainerShip
 from py3dbc.maritime.packer import MaritimePacker
+from py3dbc.maritime.constraints import MaritimeConstraintChecker
+from py3dbc.maritime.observers import ConsoleObserver, BatchingObserver
+from py3dbc.maritime.preflight import container_bounds, optimality_gap
+from py3dbc.maritime.rotation import PortRotation
+import copy
 import random
 
 random.seed(42)
 
+
+def check_plan(ship, result, gm_threshold=0.3):
+    """Fail if a plan breaks a physical invariant or its metrics disagree with the ship"""
+    for container in result['placed']:
+        slot = container.assigned_slot
+        assert slot is not None and slot.container is container, container.container_id
+        assert slot.tier == 1 or slot.stack.slots[slot.tier - 2].occupied, f"{slot.slot_id} floats"
+        assert container.total_weight <= slot.max_tier_weight, slot.slot_id
+    for stack in ship.stacks:
+        assert stack.weight <= stack.slots[0].max_stack_weight + 1e-9, stack
+    assert all(container.assigned_slot is None for container in result['failed'])
+    assert len(ship.placed_containers) == len(result['placed']) == result['metrics']['placed_containers']
+    assert result['metrics']['gm'] >= gm_threshold, result['metrics']['gm']
+
+
 print("=" * 70)
 print("Testing MaritimePacker - Realistic Scenario")
 print("=" * 70)
@@ -96,7 +116,7 @@ print(f"  Total weight: {sum(c.total_weight for c in containers):.1f}t")
 
 # Create packer and optimize
 print("\n" + "=" * 70)
-packer = MaritimePacker(ship, gm_threshold=0.3, hazmat_separation=3)
+packer = MaritimePacker(ship, gm_threshold=0.3, hazmat_separation=3, observer=ConsoleObserver())
 
 result = packer.pack(containers, strategy='heavy_first')
 
@@ -131,6 +151,175 @@ if result['failed']:
     print(f"\nFailed Placements:")
     for container in result['failed']:
         print(f"  - {container.container_id} ({container.cargo_type}, {container.total_weight}t)")
+check_plan(ship, result)
+
+# Same manifest through the vectorized engine
+print("\nVectorized Engine:")
+vector_ship = ContainerShip(
+    ship_name='FEEDER_01',
+    dimensions=(130, 20, 18),
+    bays=7,
+    rows=14,
+    tiers=7,
+    stability_params=stability_params,
+    max_weight=13500
+)
+vector_packer = MaritimePacker(vector_ship, gm_threshold=0.3, hazmat_separation=3, engine='vectorized')
+vector_result = vector_packer.pack(containers, strategy='heavy_first')
+same_plan = vector_packer.placement_log == packer.placement_log
+print(f"  Matches scalar placements: {'✓ YES' if same_plan else '✗ NO'}")
+assert same_plan and vector_result['metrics'] == result['metrics'], "vectorized engine diverged from scalar"
+
+# Without the support rule a heavy box can go above a loaded stack's top tier
+print("\nEngines Without Support:")
+loose_random = random.Random(7)
+loose_containers = [
+    MaritimeContainer(f'LOOSE{i:02d}', '20ft', 'general', round(loose_random.uniform(18, 30), 1), (6.06, 2.44, 2.59))
+    for i in range(40)
+]
+loose_logs = {}
+for engine in MaritimePacker.ENGINES:
+    loose_ship = ContainerShip(
+        ship_name='FEEDER_02',
+        dimensions=(40, 20, 18),
+        bays=2,
+        rows=4,
+        tiers=7,
+        stability_params=stability_params,
+        max_weight=13500
+    )
+    loose_checker = MaritimeConstraintChecker(hazmat_separation=3, require_support=False)
+    loose_packer = MaritimePacker(loose_ship, gm_threshold=0.3, engine=engine, checker=loose_checker)
+    loose_packer.pack(copy.deepcopy(loose_containers), strategy='heavy_first')
+    loose_logs[engine] = loose_packer.placement_log
+same_plan = loose_logs['scalar'] == loose_logs['vectorized']
+print(f"  Matches scalar placements: {'✓ YES' if same_plan else '✗ NO'}")
+assert same_plan, "vectorized engine diverged from scalar without support"
+
+# Portfolio of all strategies, best plan wins
+print("\nStrategy Portfolio:")
+portfolio_ship = ContainerShip(
+    ship_name='FEEDER_01',
+    dimensions=(130, 20, 18),
+    bays=7,
+    rows=14,
+    tiers=7,
+    stability_params=stability_params,
+    max_weight=13500
+)
+portfolio_result = MaritimePacker(portfolio_ship, gm_threshold=0.3).pack_portfolio(
+    containers, random_variants=2, max_workers=1
+)
+for run in portfolio_result['portfolio']:
+    print(f"  {run['strategy']} (seed {run['tie_break_seed']}): {run['metrics']['placement_rate']}%, GM margin {run['metrics']['stability_margin']}m")
+print(f"  ✓ Best: {portfolio_result['strategy']}")
+best_run = max(portfolio_result['portfolio'], key=lambda run: (run['metrics']['placement_rate'], run['metrics']['stability_margin']))
+assert portfolio_result['metrics']['placed_containers'] == best_run['metrics']['placed_containers']
+assert portfolio_result['metrics']['gm'] == best_run['metrics']['gm'], "replayed plan differs from the winning run"
+check_plan(portfolio_ship, portfolio_result)
+
+# Placement events in batches, as streamed to the frontend
+print("\nBatched Placement Events:")
+batches = []
+vector_ship.reset()
+batch_packer = MaritimePacker(vector_ship, gm_threshold=0.3, observer=BatchingObserver(batches.append, batch_size=10))
+batch_result = batch_packer.pack(containers)
+placements = [entry for event in batches if event['event'] == 'placements' for entry in event['placed']]
+print(f"  Events: {[event['event'] for event in batches]}")
+print(f"  Placements streamed: {len(placements)} (final GM {placements[-1]['gm']}m)")
+assert [event['event'] for event in batches][::len(batches) - 1] == ['start', 'finish']
+assert len(placements) == batch_result['metrics']['placed_containers']
+assert placements[-1]['gm'] == batch_result['metrics']['gm']
+
+# Dynamic most-constrained-first order
+print("\nMost Constrained First:")
+dynamic_ship = vector_ship.fresh_copy()
+dynamic_result = MaritimePacker(dynamic_ship, gm_threshold=0.3).pack(
+    copy.deepcopy(containers), strategy='most_constrained'
+)
+print(f"  Placed: {dynamic_result['metrics']['placed_containers']}/{dynamic_result['metrics']['total_containers']}")
+print(f"  First five: {[c.cargo_type for c in dynamic_result['placed'][:5]]}")
+assert dynamic_result['metrics']['total_containers'] == len(containers)
+check_plan(dynamic_ship, dynamic_result)
+
+# Beam search over slot choices
+print("\nBeam Search:")
+beam_ship = vector_ship.fresh_copy()
+beam_result = MaritimePacker(beam_ship, gm_threshold=0.3).pack_beam(copy.deepcopy(containers), beam_width=3, branching=2)
+print(f"  Placed: {beam_result['metrics']['placed_containers']}/{beam_result['metrics']['total_containers']} (greedy {beam_result['beam']['greedy_placed']})")
+print(f"  GM: {beam_result['metrics']['gm']}m, plans expanded: {beam_result['beam']['expanded']}")
+assert beam_result['metrics']['placed_containers'] >= beam_result['beam']['greedy_placed']
+check_plan(beam_ship, beam_result)
+
+# Local search on the greedy plan
+print("\nPlan Improvement:")
+improved = batch_packer.improve(batch_result, max_iterations=300, time_budget=None)
+report = improved['improvement']
+print(f"  Placement rate: {report['placement_rate'][0]}% → {report['placement_rate'][1]}%")
+print(f"  GM margin: {report['stability_margin'][0]}m → {report['stability_margin'][1]}m")
+print(f"  Accepted moves: {report['accepted_moves']}")
+assert report['placement_rate'][1] >= report['placement_rate'][0]
+assert len(improved['placement_log']) == improved['metrics']['placed_containers']
+check_plan(vector_ship, improved)
+
+# Upper bounds before solving, gap after
+print("\nPre-flight Bounds:")
+bounds = container_bounds(vector_ship.fresh_copy(), containers, gm_threshold=0.3)
+print(f"  Placeable: {bounds['placeable']}/{bounds['containers']}, best-case GM: {bounds['gm_best_case']}m")
+print(f"  Gap after improvement: {optimality_gap(bounds, improved['metrics'])}")
+assert bounds['placeable'] >= improved['metrics']['placed_containers']
+# Best-case GM assumes the whole manifest is loaded; a partial plan is only
+# bounded by the best case for the boxes it actually placed
+placed_bounds = container_bounds(vector_ship.fresh_copy(), improved['placed'], gm_threshold=0.3)
+assert placed_bounds['gm_best_case'] >= improved['metrics']['gm']
+if not improved['failed']:
+    assert bounds['gm_best_case'] >= improved['metrics']['gm']
+
+# Where the slot search spends its time
+print("\nProfiled Packing:")
+profiled = MaritimePacker(vector_ship.fresh_copy(), gm_threshold=0.3, profile=True).pack(copy.deepcopy(containers))
+profile = profiled['metrics']['profile']
+print(f"  Slots examined: {profile['slots_examined']} over {profile['searches']} searches")
+print(f"  Seconds per phase: {({phase: entry['seconds'] for phase, entry in profile['phases'].items()})}")
+print(f"  Rejections: {profile['rejections']}")
+assert profile['searches'] == len(containers) and profile['slots_examined'] > 0
+assert profiled['metrics']['placed_containers'] == result['metrics']['placed_containers'], "profiling changed the plan"
+
+# Why containers failed, worked out after packing
+print("\nFailure Diagnostics:")
+overweight = MaritimeContainer('HEAVY99', '20ft', 'general', 45.0, (6.06, 2.44, 2.59))
+diagnosed_packer = MaritimePacker(vector_ship.fresh_copy(), gm_threshold=0.3)
+diagnosed = diagnosed_packer.pack(copy.deepcopy(containers) + [overweight])
+diagnoses = diagnosed_packer.diagnose_failures(diagnosed['failed'])
+for container_id, diagnosis in diagnoses.items():
+    near_miss = diagnosis['near_miss']
+    print(f"  {container_id}: binding {diagnosis['binding']}")
+    print(f"    Near miss {near_miss['slot']}: {[v['detail'] for v in near_miss['violations']]}")
+assert diagnoses['HEAVY99']['feasible_slots'] == 0
+assert [v['constraint'] for v in diagnoses['HEAVY99']['near_miss']['violations']] == ['weight']
+
+# Multi-port voyage: earlier discharges should end up on top
+print("\nPort Rotation:")
+rotation = ('PORT_A', 'PORT_B', 'PORT_C')
+voyage = copy.deepcopy(containers)
+for i, container in enumerate(voyage):
+    container.destination = rotation[i % len(rotation)]
+voyage_restows = []
+for label, kwargs, strategy in (
+    ("No rotation", {}, 'heavy_first'),
+    ("Restow penalty", {'port_rotation': rotation}, 'heavy_first'),
+    ("Rotation order", {'port_rotation': rotation}, 'port_rotation'),
+):
+    voyage_ship = vector_ship.fresh_copy()
+    voyage_result = MaritimePacker(voyage_ship, gm_threshold=0.3, **kwargs).pack(
+        copy.deepcopy(voyage), strategy=strategy
+    )
+    restows = PortRotation(rotation).evaluate(voyage_ship)
+    print(f"  {label}: placed {voyage_result['metrics']['placed_containers']}, "
+          f"restows {restows['total_restows']} {[port['restows'] for port in restows['ports']]}")
+    check_plan(voyage_ship, voyage_result)
+    voyage_restows.append(restows['total_restows'])
+assert voyage_restows[0] >= voyage_restows[1] >= voyage_restows[2] == 0, voyage_restows
 
 print("\n" + "=" * 70)
 print("Packing test complete!")